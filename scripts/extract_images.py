@@ -1,106 +1,206 @@
+import json
 import os
 import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
 import fitz
 
+# Heading heuristic: A. INTRODUCTION, B. DATA GATHERING...
+HEADING_RE = re.compile(r"^[A-Z]\.\s").match
+# Subheading heuristic: B.1. Rebar Scanning, C.2. Rebar Scanning...
+SUBHEADING_RE = re.compile(r"^[A-Z]\.\d+\.\s").match
+
+# Smaller JPEGs are UI elements, logos and frames rather than report photos
+MIN_JPEG_BYTES = 10000
+
+# Sidecar listing filename, width, height and size of each extracted image
+MANIFEST_FILENAME = "manifest.json"
+
+# Upper bound for a single os.write call when saving large images
+WRITE_CHUNK_SIZE = 256 * 1024
+
+# Page scanning parallelizes poorly past a handful of processes
+MAX_SCAN_WORKERS = 4
+
+# Characters that are not allowed in file names are replaced with "-"
+FILENAME_SANITIZE_TABLE = str.maketrans('/:*?"<>|', "-" * 8)
+
+# Text-only extraction: skip embedding image blocks in the page dict
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def _extract_jpeg(doc, xref):
+    # Only DCTDecode streams are JPEGs; skip decoding anything else
+    _, filters = doc.xref_get_key(xref, "Filter")
+    if "DCTDecode" not in filters:
+        return None
+
+    try:
+        img_dict = doc.extract_image(xref)
+    except Exception as e:
+        print(f"Failed to extract image xref {xref}: {e}")
+        return None
+
+    return img_dict["ext"], img_dict["image"], img_dict["width"], img_dict["height"]
+
+
+def _is_small_jpeg_stream(doc, xref):
+    # A plain DCTDecode stream is the JPEG file itself, so its Length is the saved size
+    _, filters = doc.xref_get_key(xref, "Filter")
+    length_type, length = doc.xref_get_key(xref, "Length")
+    return filters == "/DCTDecode" and length_type == "int" and int(length) < MIN_JPEG_BYTES
+
+
+def _write_bytes(filepath, data):
+    # Unbuffered write: skip the BufferedWriter allocation for each saved image
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view[:WRITE_CHUNK_SIZE])
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def _scan_document_page(doc, page_num):
+    page = doc[page_num]
+
+    # 1. Gather all text events as (y, type, payload): 0 heading, 1 subheading, 2 image xref
+    events = []
+    for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]:
+        if "lines" in block:
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    size = span["size"]
+                    if size <= 10.5 or "Bold" not in span["font"]:
+                        continue
+
+                    text = span["text"].strip()
+                    if not text:
+                        continue
+
+                    y_pos = span["origin"][1]
+
+                    if size > 13 and HEADING_RE(text):
+                        events.append((y_pos, 0, text))
+                    elif SUBHEADING_RE(text):
+                        events.append((y_pos, 1, text))
+
+    # 2. Gather image events, resolving placements only for JPEG (DCTDecode) images
+    for img in doc.get_page_images(page_num, full=True):
+        xref, image_filter = img[0], img[8]
+        if "DCTDecode" not in image_filter or _is_small_jpeg_stream(doc, xref):
+            continue
+
+        for rect in page.get_image_rects(xref):
+            events.append((rect.y0, 2, xref))  # Top Y coordinate of each placement
+
+    # 3. Sort events by Y-coordinate (top to bottom); text sorts before images on ties
+    events.sort()
+
+    # Evict MuPDF's cached objects for this page before moving on
+    del page
+    fitz.TOOLS.store_shrink(100)
+
+    return events
+
+
+_worker_doc = None
+
+
+def _init_scan_worker(pdf_path):
+    # Each worker opens its own document; fitz.Document objects are not shareable across processes
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _scan_page(page_num):
+    return _scan_document_page(_worker_doc, page_num)
+
 
 def extract_pdf_images(pdf_path, output_dir):
     os.makedirs(output_dir, exist_ok=True)
 
-    doc = fitz.open(pdf_path)
-
-    current_heading = "Unknown Heading"
-    current_subheading = "Unknown Subheading"
-
-    # Track counts to avoid overwriting files with the same heading/subheading
-    image_counters = {}
-
-    # Keep track of processed images by (page_num, xref, y_pos) to avoid exact duplicates
-    processed_images = set()
-
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-
-        # 1. Gather all text events
-        events = []
-        for block in page.get_text("dict")["blocks"]:
-            if "lines" in block:
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if not text:
-                            continue
-
-                        is_bold = "Bold" in span["font"]
-                        size = span["size"]
-                        y_pos = span["origin"][1]
-
-                        # Heading heuristic: A. INTRODUCTION, B. DATA GATHERING...
-                        if size > 13 and is_bold and re.match(r"^[A-Z]\.\s", text):
-                            events.append({"type": "heading", "y": y_pos, "text": text})
-
-                        # Subheading heuristic: B.1. Rebar Scanning, C.2. Rebar Scanning...
-                        elif size > 10.5 and is_bold and re.match(r"^[A-Z]\.\d+\.\s", text):
-                            events.append({"type": "subheading", "y": y_pos, "text": text})
-
-        # 2. Gather all image events
-        for img in page.get_image_info(xrefs=True):
-            xref = img["xref"]
-            y_pos = img["bbox"][1]  # Top Y coordinate of the image bounding box
-            events.append({"type": "image", "y": y_pos, "xref": xref})
-
-        # 3. Sort events by Y-coordinate (top to bottom)
-        events.sort(key=lambda e: e["y"])
-
-        # 4. Process events
-        for event in events:
-            if event["type"] == "heading":
-                current_heading = re.sub(r'[\/:*?"<>|]', "-", event["text"])
-                current_subheading = "Unknown Subheading"
-            elif event["type"] == "subheading":
-                current_subheading = re.sub(r'[\/:*?"<>|]', "-", event["text"])
-            elif event["type"] == "image":
-                xref = event["xref"]
-                y_pos = event["y"]
-                image_key = (page_num, xref, int(y_pos))
-
-                if image_key in processed_images:
-                    continue
-
-                try:
-                    img_dict = doc.extract_image(xref)
-                except Exception as e:
-                    print(f"Failed to extract image xref {xref}: {e}")
-                    continue
-
-                # Filter out small UI elements, logos, frames (usually PNGs or very small files)
-                ext = img_dict["ext"]
-                img_data = img_dict["image"]
-
-                # Heuristic: Real photos in this PDF report are JPEGs and > 10KB
-                if ext != "jpeg" or len(img_data) < 10000:
-                    continue
-
-                processed_images.add(image_key)
-
-                # Create base filename
-                if current_subheading == "Unknown Subheading":
-                    base_name = f"{current_heading}"
-                else:
+    with fitz.open(pdf_path) as doc:
+        # File name prefix for the current "heading" or "heading - subheading" position
+        current_heading = "Unknown Heading"
+        base_name = current_heading
+
+        # Track counts to avoid overwriting files with the same heading/subheading
+        image_counters = defaultdict(int)
+
+        # (ext, bytes, width, height) per xref; None marks xrefs rejected as non-JPEG or unreadable
+        seen_xref: dict[int, tuple[str, bytes, int, int] | None] = {}
+
+        # Dimensions of every saved image, written out so consumers can skip decoding the files
+        manifest = []
+
+        page_count = len(doc)
+        workers = min(os.cpu_count() or 1, MAX_SCAN_WORKERS, page_count)
+        if workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_scan_worker, initargs=(pdf_path,)
+            ) as executor:
+                page_events = list(executor.map(_scan_page, range(page_count)))
+        else:
+            page_events = [_scan_document_page(doc, page_num) for page_num in range(page_count)]
+
+        for events in page_events:
+            # Images already saved at an exact (xref, y_pos) placement on this page
+            processed_images: set[tuple[int, int]] = set()
+
+            # 4. Process events
+            for y_pos, event_type, payload in events:
+                if event_type == 0:
+                    current_heading = payload.translate(FILENAME_SANITIZE_TABLE)
+                    base_name = current_heading
+                elif event_type == 1:
+                    current_subheading = payload.translate(FILENAME_SANITIZE_TABLE)
                     base_name = f"{current_heading} - {current_subheading}"
-
-                # Increment counter for this specific base name
-                if base_name not in image_counters:
-                    image_counters[base_name] = 1
                 else:
-                    image_counters[base_name] += 1
+                    xref = payload
+                    image_key = (xref, int(y_pos))
+
+                    if image_key in processed_images:
+                        continue
 
-                count = image_counters[base_name]
-                filename = f"{base_name} - {count}.{ext}"
-                filepath = os.path.join(output_dir, filename)
+                    if xref not in seen_xref:
+                        seen_xref[xref] = _extract_jpeg(doc, xref)
 
-                with open(filepath, "wb") as f:
-                    f.write(img_data)
-                print(f"Saved: {filename}")
+                    extracted = seen_xref[xref]
+                    if extracted is None:
+                        continue
+
+                    # Filter out small UI elements, logos, frames (usually PNGs or very small files)
+                    ext, img_data, width, height = extracted
+
+                    # Heuristic: Real photos in this PDF report are JPEGs and > 10KB
+                    if ext != "jpeg" or len(img_data) < MIN_JPEG_BYTES:
+                        continue
+
+                    processed_images.add(image_key)
+
+                    # Increment counter for this specific base name
+                    image_counters[base_name] += 1
+                    count = image_counters[base_name]
+                    filename = f"{base_name} - {count}.{ext}"
+                    filepath = os.path.join(output_dir, filename)
+
+                    _write_bytes(filepath, img_data)
+                    manifest.append(
+                        {
+                            "filename": filename,
+                            "width": width,
+                            "height": height,
+                            "size": len(img_data),
+                        }
+                    )
+                    print(f"Saved: {filename}")
+
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
 
 
 if __name__ == "__main__":
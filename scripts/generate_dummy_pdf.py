@@ -1,4 +1,10 @@
+import fnmatch
+import json
+import mmap
 import os
+import re
+import shutil
+import struct
 import sys
 import uuid
 from datetime import datetime, timezone
@@ -64,77 +70,154 @@ ANNEX_PAGE_LAYOUTS: dict[AnnexGroupName, tuple[PageSize, ...]] = {
 }
 
 
+# Map PhotoGroupNames to patterns from our extracted images
+DUMMY_IMAGE_PATTERNS: dict[PhotoGroupName, str] = {
+    PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO: "A. INTRODUCTION*.jpeg",
+    PhotoGroupName.SUPERSTRUCTURE_REBAR_SCANNING_PHOTOS: "*B.1. Rebar Scanning*.jpeg",
+    PhotoGroupName.SUPERSTRUCTURE_REBOUND_HAMMER_TEST_PHOTOS: "*B.2. Rebound Hammer Test*.jpeg",
+    PhotoGroupName.SUPERSTRUCTURE_CONCRETE_CORING_PHOTOS: "*B.3. Concrete Core Extraction*.jpeg",
+    # Just use some coring photos for family pic if we don't have specific ones
+    PhotoGroupName.SUPERSTRUCTURE_CORE_SAMPLES_FAMILY_PIC: "*B.3. Concrete Core Extraction - 1*.jpeg",
+    PhotoGroupName.SUPERSTRUCTURE_REBAR_EXTRACTION_PHOTOS: "*B.4. Rebar Extraction*.jpeg",
+    PhotoGroupName.SUPERSTRUCTURE_REBAR_SAMPLES_FAMILY_PIC: "*B.4. Rebar Extraction - 1*.jpeg",
+    PhotoGroupName.SUPERSTRUCTURE_CHIPPING_OF_SLAB_PHOTOS: "*B.5. Chipping of Existing Slab*.jpeg",
+    PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS: "*B.6. Restoration Works*.jpeg",
+    PhotoGroupName.SUBSTRUCTURE_CORING_FOR_FOUNDATION_PHOTOS: "*C.1. Concrete Core Extraction*.jpeg",
+    PhotoGroupName.SUBSTRUCTURE_REBAR_SCANNING_FOR_FOUNDATION_PHOTOS: "*C.2. Rebar Scanning*.jpeg",
+    PhotoGroupName.SUBSTRUCTURE_RESTORATION_BACKFILLING_COMPACTION_PHOTOS: "*C.3. Restoration*.jpeg",
+}
+
+# Compile the glob patterns once instead of on every copy_dummy_images call
+_DUMMY_IMAGE_MATCHERS = [
+    (group_name, re.compile(fnmatch.translate(pattern)).match)
+    for group_name, pattern in DUMMY_IMAGE_PATTERNS.items()
+]
+
+# Start-of-frame markers carry the image dimensions; C4/C8/CC are DHT/JPG/DAC
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Dimension scan stops after the first 64 KiB of header segments
+JPEG_HEADER_READ_BYTES = 64 * 1024
+
+
+def _jpeg_size(path: Path) -> tuple[int, int] | None:
+    """Read JPEG width/height from the SOF segment without decoding the image."""
+    with path.open("rb") as jpeg_file:
+        if os.fstat(jpeg_file.fileno()).st_size < 4:
+            return None
+
+        # Map the file so only the header pages are faulted in, not the pixel data
+        with mmap.mmap(jpeg_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _scan_jpeg_sof(data, min(len(data), JPEG_HEADER_READ_BYTES))
+
+
+def _scan_jpeg_sof(data: mmap.mmap, limit: int) -> tuple[int, int] | None:
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    offset = 2
+    while offset + 9 <= limit:
+        if data[offset] != 0xFF:
+            return None
+
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", data, offset + 5)
+            return width, height
+
+        (segment_length,) = struct.unpack_from(">H", data, offset + 2)
+        offset += 2 + segment_length
+
+    return None
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Copy file contents in-kernel via copy_file_range, preserving timestamps."""
+    with src.open("rb") as source, dst.open("wb") as destination:
+        src_stat = os.fstat(source.fileno())
+        try:
+            remaining = src_stat.st_size
+            while remaining > 0:
+                copied = os.copy_file_range(source.fileno(), destination.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except (AttributeError, OSError):
+            # copy_file_range is Linux-only and unsupported across some filesystems
+            source.seek(0)
+            destination.seek(0)
+            destination.truncate()
+            shutil.copyfileobj(source, destination)
+
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+
 def copy_dummy_images(session_id: uuid.UUID, sessions_root: Path) -> dict[str, list[ImageMeta]]:
     """Copy extracted images into the session folder to simulate uploaded photos."""
-    import glob
-    import shutil
-
     extracted_dir = Path("extracted_images")
     if not extracted_dir.exists():
         print("extracted_images directory not found. Please run extract_images.py first.")
         return {}
 
     session_images_dir = sessions_root / str(session_id) / "images"
-    os.makedirs(session_images_dir, exist_ok=True)
-
-    # Map PhotoGroupNames to patterns from our extracted images
-    mappings = {
-        PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO: "A. INTRODUCTION*.jpeg",
-        PhotoGroupName.SUPERSTRUCTURE_REBAR_SCANNING_PHOTOS: "*B.1. Rebar Scanning*.jpeg",
-        PhotoGroupName.SUPERSTRUCTURE_REBOUND_HAMMER_TEST_PHOTOS: "*B.2. Rebound Hammer Test*.jpeg",
-        PhotoGroupName.SUPERSTRUCTURE_CONCRETE_CORING_PHOTOS: "*B.3. Concrete Core Extraction*.jpeg",
-        # Just use some coring photos for family pic if we don't have specific ones
-        PhotoGroupName.SUPERSTRUCTURE_CORE_SAMPLES_FAMILY_PIC: "*B.3. Concrete Core Extraction - 1*.jpeg",
-        PhotoGroupName.SUPERSTRUCTURE_REBAR_EXTRACTION_PHOTOS: "*B.4. Rebar Extraction*.jpeg",
-        PhotoGroupName.SUPERSTRUCTURE_REBAR_SAMPLES_FAMILY_PIC: "*B.4. Rebar Extraction - 1*.jpeg",
-        PhotoGroupName.SUPERSTRUCTURE_CHIPPING_OF_SLAB_PHOTOS: "*B.5. Chipping of Existing Slab*.jpeg",
-        PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS: "*B.6. Restoration Works*.jpeg",
-        PhotoGroupName.SUBSTRUCTURE_CORING_FOR_FOUNDATION_PHOTOS: "*C.1. Concrete Core Extraction*.jpeg",
-        PhotoGroupName.SUBSTRUCTURE_REBAR_SCANNING_FOR_FOUNDATION_PHOTOS: "*C.2. Rebar Scanning*.jpeg",
-        PhotoGroupName.SUBSTRUCTURE_RESTORATION_BACKFILLING_COMPACTION_PHOTOS: "*C.3. Restoration*.jpeg",
-    }
 
-    images_metadata: dict[str, list[ImageMeta]] = {}
+    # Dimensions recorded by extract_images.py; older extractions fall back to header probing
+    manifest_path = extracted_dir / "manifest.json"
+    image_dimensions: dict[str, tuple[int, int]] = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        image_dimensions = {item["filename"]: (item["width"], item["height"]) for item in manifest}
 
-    for group_name, pattern in mappings.items():
-        group_dir = session_images_dir / group_name.value
-        os.makedirs(group_dir, exist_ok=True)
+    # List the directory once and match every group pattern against the names in memory
+    with os.scandir(extracted_dir) as scan:
+        extracted_entries = {entry.name: entry for entry in scan if entry.is_file()}
+    extracted_names = list(extracted_entries)
 
+    images_metadata: dict[str, list[ImageMeta]] = {}
+
+    for group_name, matches_pattern in _DUMMY_IMAGE_MATCHERS:
         if group_name == PhotoGroupName.SUPERSTRUCTURE_REBAR_SCANNING_PHOTOS:
-            candidate_files = [
-                extracted_dir
-                / "C. DATA GATHERING FOR SUBSTRUCTURE - C.3. Restoration for Coring Works, Backfilling, and Compaction - 4.jpeg",
-                extracted_dir
-                / "C. DATA GATHERING FOR SUBSTRUCTURE - C.3. Restoration for Coring Works, Backfilling, and Compaction - 5.jpeg",
-                extracted_dir
-                / "C. DATA GATHERING FOR SUBSTRUCTURE - C.3. Restoration for Coring Works, Backfilling, and Compaction - 6.jpeg",
-                extracted_dir
-                / "B. DATA GATHERING FOR SUPERSTRUCTURE - B.1. Rebar Scanning - 1.jpeg",
-                extracted_dir
-                / "B. DATA GATHERING FOR SUPERSTRUCTURE - B.1. Rebar Scanning - 2.jpeg",
+            candidate_names = [
+                "C. DATA GATHERING FOR SUBSTRUCTURE - C.3. Restoration for Coring Works, Backfilling, and Compaction - 4.jpeg",
+                "C. DATA GATHERING FOR SUBSTRUCTURE - C.3. Restoration for Coring Works, Backfilling, and Compaction - 5.jpeg",
+                "C. DATA GATHERING FOR SUBSTRUCTURE - C.3. Restoration for Coring Works, Backfilling, and Compaction - 6.jpeg",
+                "B. DATA GATHERING FOR SUPERSTRUCTURE - B.1. Rebar Scanning - 1.jpeg",
+                "B. DATA GATHERING FOR SUPERSTRUCTURE - B.1. Rebar Scanning - 2.jpeg",
             ]
-            matched_files = [str(path) for path in candidate_files if path.exists()]
+            matched_names = [name for name in candidate_names if name in extracted_entries]
         else:
-            matched_files = glob.glob(str(extracted_dir / pattern))
+            matched_names = [name for name in extracted_names if matches_pattern(name)]
+
+        if not matched_names:
+            continue
+
+        matched_entries = [extracted_entries[name] for name in matched_names]
+
+        # Only groups that receive files get a directory
+        group_dir = session_images_dir / group_name.value
+        os.makedirs(group_dir, exist_ok=True)
 
         # Limit the number of photos to the maximum defined by the model
         _, max_images = PHOTO_GROUP_LIMITS.get(group_name, (1, 4))
 
         group_metadata: list[ImageMeta] = []
-        for i, filepath in enumerate(matched_files):
+        for i, entry in enumerate(matched_entries):
             if i >= max_images:
                 break
 
-            src = Path(filepath)
-            if not src.exists():
-                continue
-
+            src = Path(entry.path)
             dest_filename = f"{uuid.uuid4()}.jpeg"
             dest = group_dir / dest_filename
-            shutil.copy2(src, dest)
+            _fast_copy(src, dest)
 
-            with Image.open(src) as img:
-                width, height = img.size
+            size = image_dimensions.get(entry.name) or _jpeg_size(src)
+            if size is None:
+                with Image.open(src) as img:
+                    size = img.size
+            width, height = size
 
             img_id = uuid.uuid4()
             group_metadata.append(
@@ -143,7 +226,7 @@ def copy_dummy_images(session_id: uuid.UUID, sessions_root: Path) -> dict[str, l
                     group_name=group_name,
                     original_filename=src.name,
                     stored_filename=dest_filename,
-                    size_bytes=src.stat().st_size,
+                    size_bytes=entry.stat().st_size,
                     width=width,
                     height=height,
                 )
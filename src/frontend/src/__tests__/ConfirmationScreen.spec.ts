@@ -145,6 +145,7 @@ function createUploadItem(groupName: PhotoGroupName): UploadItem {
       size_bytes: 1234,
       width: 900,
       height: 600,
+      is_landscape: true,
     },
   }
 }
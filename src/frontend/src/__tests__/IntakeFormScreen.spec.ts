@@ -166,6 +166,7 @@ function createUploadItem(groupName: PhotoGroupName, uploaded: boolean): UploadI
           size_bytes: 1234,
           width: 900,
           height: 600,
+          is_landscape: true,
         }
       : null,
   }
@@ -366,6 +367,7 @@ describe('IntakeFormScreen', () => {
         size_bytes: 777,
         width: 800,
         height: 600,
+        is_landscape: true,
       },
     })
     saveReportFormFieldsMock.mockResolvedValue({})
@@ -88,6 +88,7 @@ export interface ImageMeta {
   size_bytes: number
   width: number
   height: number
+  is_landscape: boolean
 }
 
 export interface AnnexDocumentMeta {
@@ -106,6 +107,7 @@ export interface ReportSession {
   images: Record<string, ImageMeta[]>
   annex_documents: Partial<Record<AnnexGroupName, AnnexDocumentMeta>>
   generated_pdf_path: string | null
+  total_upload_bytes: number
 }
 
 export interface SessionStatusResponse {
@@ -1,17 +1,26 @@
 # pyright: reportUnusedFunction=false
 
 import asyncio
+import struct
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager, suppress
 from datetime import timedelta
-from os import SEEK_END, getenv
+from functools import partial
+from io import BytesIO
+from multiprocessing import get_context
+from os import getenv, stat, stat_result
 from pathlib import Path
+from random import uniform
 from typing import BinaryIO
 from uuid import UUID
 
-from fastapi import FastAPI, File, HTTPException, Request, UploadFile, status
+from anyio import to_thread
+from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Request, UploadFile, status
 from fastapi.concurrency import run_in_threadpool
-from fastapi.responses import FileResponse, JSONResponse
-from PIL import Image, UnidentifiedImageError
+from fastapi.responses import FileResponse, JSONResponse, Response
+from PIL import Image, ImageOps, UnidentifiedImageError
 from pydantic import BaseModel
 from pypdf import PdfReader
 
@@ -20,6 +29,7 @@ from reportr.reporting.activity_report_pdf_renderer import (
     RendererNotReadyError,
     UnconfiguredActivityReportPdfRenderer,
     WeasyPrintActivityReportPdfRenderer,
+    warm_up_weasyprint,
 )
 from reportr.storage.models import (
     ANNEX_GROUP_LIMITS,
@@ -34,22 +44,75 @@ from reportr.storage.models import (
 )
 from reportr.storage.report_repository import (
     FileSystemReportRepository,
+    PhotoGroupFullError,
     ReportRepository,
+    ReportStatusConflictError,
     SessionNotFoundError,
+    SessionUploadLimitError,
 )
 
 MAX_FILE_SIZE_BYTES = 15 * 1024 * 1024
 MAX_SESSION_SIZE_BYTES = 300 * 1024 * 1024
-MAX_IMAGE_LONGEST_SIDE = 1200
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024
+# The tallest figure slot is 125 mm, so 1000 px still prints at ~200 DPI; it also matches the
+# frontend's compression size, so browser uploads are stored without re-encoding
+MAX_IMAGE_LONGEST_SIDE = 1000
+# Checked against the probed header before decoding; a 15MB file can declare a raster of
+# gigabytes. 50 megapixels covers camera originals and decodes to at most ~150MB of RGB
+MAX_IMAGE_PIXELS = 50_000_000
 RENDER_CONCURRENCY_LIMIT = 3
+# Renders reserve credits from this pool: RENDER_CONCURRENCY_LIMIT small reports fit at once,
+# and each RENDER_CREDIT_UPLOAD_BYTES of uploads costs one more credit, up to the whole pool
+RENDER_CREDIT_TOTAL = 99
+RENDER_CREDIT_UPLOAD_BYTES = 2 * 1024 * 1024
+THREADPOOL_LIMIT = 100
 ABANDONED_SESSION_TTL_SECONDS = 24 * 60 * 60
 SESSION_CLEANUP_INTERVAL_SECONDS = 30 * 60
-ALLOWED_IMAGE_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
-ALLOWED_ANNEX_MIME_TYPES = {"application/pdf"}
+SESSION_CLEANUP_JITTER_RATIO = 0.1
+ALLOWED_IMAGE_MIME_TYPES = frozenset({"image/jpeg", "image/png", "image/webp"})
+ALLOWED_ANNEX_MIME_TYPES = frozenset({"application/pdf"})
+ALLOWED_IMAGE_MIME_TYPES_TEXT = ", ".join(sorted(ALLOWED_IMAGE_MIME_TYPES))
+ALLOWED_ANNEX_MIME_TYPES_TEXT = ", ".join(sorted(ALLOWED_ANNEX_MIME_TYPES))
+# Pre-encoded so the health probe skips response validation and JSON encoding
+HEALTH_OK_BODY = b'{"status":"ok"}'
+DOWNLOAD_CACHE_CONTROL = "private, max-age=3600"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Pillow plugins matching ALLOWED_IMAGE_MIME_TYPES; skips probing every other registered format
+PIL_IMAGE_FORMATS = ("JPEG", "PNG", "WEBP")
+DOWNSCALE_SAVE_OPTIONS: dict[str, dict[str, int | bool]] = {
+    "JPEG": {"quality": 85, "optimize": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 85},
+}
+# Start-of-frame markers carry JPEG dimensions; C4/C8/CC are DHT/JPG/DAC
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
 
 DATA_ROOT_ENV = "REPORTR_DATA_ROOT"
 SESSIONS_ROOT_ENV = "REPORTR_SESSIONS_ROOT"
 REPORTS_ROOT_ENV = "REPORTR_REPORTS_ROOT"
+# Resolved once at import; only the environment lookups stay per create_app() call
+SOURCE_ROOT = Path(__file__).resolve().parents[2]
+
+
+class CreditSemaphore:
+    def __init__(self, total_credits: int) -> None:
+        self.total_credits = total_credits
+        self._available_credits = total_credits
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def reserve(self, credits: int) -> AsyncIterator[None]:
+        credits = min(credits, self.total_credits)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._available_credits >= credits)
+            self._available_credits -= credits
+
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._available_credits += credits
+                self._condition.notify_all()
 
 
 class SessionStatusResponse(BaseModel):
@@ -73,13 +136,19 @@ class GenerateReportResponse(BaseModel):
 def create_app(
     repository: ReportRepository | None = None,
     renderer: ActivityReportPdfRenderer | None = None,
-    render_semaphore: asyncio.Semaphore | None = None,
+    render_semaphore: CreditSemaphore | None = None,
     session_ttl_seconds: int = ABANDONED_SESSION_TTL_SECONDS,
     cleanup_interval_seconds: int = SESSION_CLEANUP_INTERVAL_SECONDS,
+    render_executor: Executor | None = None,
 ) -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         app.state.cleanup_task = None
+        to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_LIMIT
+        # The default pool lives exactly as long as one startup/shutdown cycle, so the app can
+        # be started again after shutdown; an injected executor belongs to the caller
+        if render_executor is None:
+            app.state.render_executor = _build_default_render_executor(app.state.report_renderer)
 
         if session_ttl_seconds > 0 and cleanup_interval_seconds > 0:
             app.state.cleanup_task = asyncio.create_task(
@@ -99,18 +168,34 @@ def create_app(
                 with suppress(asyncio.CancelledError):
                     await cleanup_task
 
+            if render_executor is None and app.state.render_executor is not None:
+                app.state.render_executor.shutdown(cancel_futures=True)
+                app.state.render_executor = None
+
     app = FastAPI(title="SBS Reportr API", version="0.1.0", lifespan=lifespan)
     app.state.report_repository = repository or _build_default_repository()
     app.state.report_renderer = renderer or _build_default_renderer(app.state.report_repository)
-    app.state.render_semaphore = render_semaphore or asyncio.Semaphore(RENDER_CONCURRENCY_LIMIT)
+    app.state.render_semaphore = render_semaphore or CreditSemaphore(RENDER_CREDIT_TOTAL)
+    # Without a running lifespan, renders fall back to the thread pool
+    app.state.render_executor = render_executor
 
     @app.exception_handler(SessionNotFoundError)
     async def handle_session_not_found(_: Request, exc: SessionNotFoundError) -> JSONResponse:
         return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": str(exc)})
 
-    @app.get("/health", tags=["health"])
-    async def healthcheck() -> dict[str, str]:
-        return {"status": "ok"}
+    @app.exception_handler(PhotoGroupFullError)
+    async def handle_photo_group_full(_: Request, exc: PhotoGroupFullError) -> JSONResponse:
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
+
+    @app.exception_handler(SessionUploadLimitError)
+    async def handle_session_upload_limit(_: Request, exc: SessionUploadLimitError) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, content={"detail": str(exc)}
+        )
+
+    @app.get("/health", tags=["health"], response_class=Response)
+    async def healthcheck() -> Response:
+        return Response(content=HEALTH_OK_BODY, media_type="application/json")
 
     @app.post(
         "/reports",
@@ -119,7 +204,7 @@ def create_app(
         tags=["reports"],
     )
     async def create_report_session() -> SessionStatusResponse:
-        created = app.state.report_repository.create_session()
+        created = await run_in_threadpool(app.state.report_repository.create_session)
         return SessionStatusResponse(session_id=created.id, status=created.status)
 
     @app.put("/reports/{session_id}", response_model=ReportSession, tags=["reports"])
@@ -127,7 +212,9 @@ def create_app(
         session_id: UUID,
         form_fields: ReportFormFields,
     ) -> ReportSession:
-        return app.state.report_repository.save_form_fields(session_id, form_fields)
+        return await run_in_threadpool(
+            app.state.report_repository.save_form_fields, session_id, form_fields
+        )
 
     @app.post(
         "/reports/{session_id}/images/{group_name}",
@@ -144,49 +231,41 @@ def create_app(
             _validate_image_mime_type(image)
 
             repository: ReportRepository = app.state.report_repository
-            session = _require_session(repository, session_id)
-
-            size_bytes = _get_upload_size(image.file)
-            if size_bytes > MAX_FILE_SIZE_BYTES:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="Image exceeds the 15MB file size limit.",
-                )
+            session = await run_in_threadpool(_require_session, repository, session_id)
 
+            # Early rejects before reading the upload; save_image re-checks both limits under the
+            # session lock, since concurrent uploads can all pass these
+            group_value = group_name.value
             max_images = PHOTO_GROUP_LIMITS[group_name][1]
-            existing_group_count = len(session.images.get(group_name.value, []))
+            existing_group_count = len(session.images.get(group_value, ()))
             if existing_group_count >= max_images:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Photo group '{group_name.value}' already reached its max of {max_images}.",
+                    detail=f"Photo group '{group_value}' already reached its max of {max_images}.",
                 )
 
-            existing_total_size = sum(
-                image_meta.size_bytes
-                for image_set in session.images.values()
-                for image_meta in image_set
-            ) + sum(document.size_bytes for document in session.annex_documents.values())
-            if existing_total_size + size_bytes > MAX_SESSION_SIZE_BYTES:
+            content = await _read_upload(image, limit=MAX_FILE_SIZE_BYTES)
+            if content is None:
                 raise HTTPException(
                     status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="Session exceeds the 300MB total upload limit.",
+                    detail="Image exceeds the 15MB file size limit.",
                 )
+            size_bytes = len(content)
 
-            width, height = _get_image_dimensions(image.file)
-            if max(width, height) > MAX_IMAGE_LONGEST_SIDE:
+            existing_total_size = session.total_upload_bytes
+            if existing_total_size + size_bytes > MAX_SESSION_SIZE_BYTES:
                 raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-                    detail="Image dimensions exceed the 1200px longest-side limit.",
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Session exceeds the 300MB total upload limit.",
                 )
 
-            saved_image = repository.save_image(
+            saved_image = await run_in_threadpool(
+                _store_image,
+                repository,
                 session_id,
                 group_name=group_name,
-                source=image.file,
+                content=content,
                 original_filename=image.filename or "upload.bin",
-                size_bytes=size_bytes,
-                width=width,
-                height=height,
             )
 
             return ImageUploadResponse(image=saved_image)
@@ -208,16 +287,17 @@ def create_app(
             _validate_annex_mime_type(document)
 
             repository: ReportRepository = app.state.report_repository
-            session = _require_session(repository, session_id)
+            session = await run_in_threadpool(_require_session, repository, session_id)
 
-            size_bytes = _get_upload_size(document.file)
-            if size_bytes > MAX_FILE_SIZE_BYTES:
+            content = await _read_upload(document, limit=MAX_FILE_SIZE_BYTES)
+            if content is None:
                 raise HTTPException(
                     status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                     detail="PDF exceeds the 15MB file size limit.",
                 )
+            size_bytes = len(content)
 
-            _validate_annex_pdf(document.file)
+            await run_in_threadpool(_validate_annex_pdf, BytesIO(content))
 
             max_documents = ANNEX_GROUP_LIMITS[group_name][1]
             if max_documents <= 0:
@@ -227,13 +307,7 @@ def create_app(
                 )
 
             existing_document = session.annex_documents.get(group_name.value)
-            existing_total_size = sum(
-                image_meta.size_bytes
-                for image_set in session.images.values()
-                for image_meta in image_set
-            ) + sum(
-                saved_document.size_bytes for saved_document in session.annex_documents.values()
-            )
+            existing_total_size = session.total_upload_bytes
             if existing_document is not None:
                 existing_total_size -= existing_document.size_bytes
 
@@ -243,12 +317,14 @@ def create_app(
                     detail="Session exceeds the 300MB total upload limit.",
                 )
 
-            saved_document = repository.save_annex_document(
+            saved_document = await run_in_threadpool(
+                repository.save_annex_document,
                 session_id,
                 group_name=group_name,
-                source=document.file,
+                source=BytesIO(content),
                 original_filename=document.filename or "upload.pdf",
                 size_bytes=size_bytes,
+                max_total_upload_bytes=MAX_SESSION_SIZE_BYTES,
             )
 
             return AnnexUploadResponse(document=saved_document)
@@ -258,35 +334,27 @@ def create_app(
     @app.post(
         "/reports/{session_id}/generate", response_model=GenerateReportResponse, tags=["reports"]
     )
-    async def generate_report(session_id: UUID) -> GenerateReportResponse:
+    async def generate_report(
+        session_id: UUID, background_tasks: BackgroundTasks
+    ) -> GenerateReportResponse:
         repository: ReportRepository = app.state.report_repository
         report_renderer: ActivityReportPdfRenderer = app.state.report_renderer
 
-        session = _require_session(repository, session_id)
-
-        existing_pdf_path = repository.get_generated_pdf_path(session_id)
+        # Every repository call below reads or rewrites session.json, or writes the PDF, and may
+        # wait on the session lock, so none of them runs on the event loop
+        existing_pdf_path = await run_in_threadpool(
+            repository.ensure_completed_if_pdf_exists, session_id
+        )
         if existing_pdf_path is not None:
-            if session.status != ReportStatus.COMPLETED:
-                repository.set_status(session_id, ReportStatus.COMPLETED)
-
             return GenerateReportResponse(
                 session_id=session_id,
                 download_url=f"/reports/{session_id}/download",
             )
 
-        if session.status == ReportStatus.COMPLETED:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=(
-                    "Report was already generated, but the generated PDF is no longer available."
-                ),
-            )
+        session = await run_in_threadpool(_require_session, repository, session_id)
 
-        if session.status == ReportStatus.GENERATING:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Report generation is already in progress.",
-            )
+        if session.status != ReportStatus.DRAFT:
+            raise _generation_conflict_error(session.status)
 
         if session.form_fields is None:
             raise HTTPException(
@@ -298,58 +366,136 @@ def create_app(
                 },
             )
 
-        repository.set_status(session_id, ReportStatus.GENERATING)
+        # Claimed under the session lock: another generate request may have claimed the session
+        # while this one awaited the reads above
+        try:
+            await run_in_threadpool(
+                partial(
+                    repository.set_status,
+                    session_id,
+                    ReportStatus.GENERATING,
+                    expected_status=ReportStatus.DRAFT,
+                )
+            )
+        except ReportStatusConflictError as exc:
+            raise _generation_conflict_error(exc.status) from exc
 
-        async with app.state.render_semaphore:
+        render_semaphore: CreditSemaphore = app.state.render_semaphore
+        async with render_semaphore.reserve(_render_credits(session)):
+            executor: Executor | None = app.state.render_executor
             try:
-                latest_session = _require_session(repository, session_id)
-                pdf_bytes = await run_in_threadpool(
-                    report_renderer.render, latest_session, allow_incomplete=True
-                )
+                latest_session = await run_in_threadpool(_require_session, repository, session_id)
+                render = partial(report_renderer.render, latest_session, allow_incomplete=True)
+                if executor is None:
+                    pdf_bytes = await run_in_threadpool(render)
+                else:
+                    pdf_bytes = await asyncio.get_running_loop().run_in_executor(executor, render)
+            except BrokenProcessPool as exc:
+                await run_in_threadpool(repository.set_status, session_id, ReportStatus.DRAFT)
+                # A dead worker breaks the whole pool; the default one is rebuilt so later
+                # requests render again, unless a concurrent request already replaced it
+                if render_executor is None and app.state.render_executor is executor:
+                    app.state.render_executor = _build_default_render_executor(report_renderer)
+                    if executor is not None:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Report renderer restarted. Please try again.",
+                ) from exc
             except RendererNotReadyError as exc:
-                repository.set_status(session_id, ReportStatus.DRAFT)
+                await run_in_threadpool(repository.set_status, session_id, ReportStatus.DRAFT)
                 raise HTTPException(
                     status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
                 ) from exc
             except Exception:
-                repository.set_status(session_id, ReportStatus.DRAFT)
+                await run_in_threadpool(repository.set_status, session_id, ReportStatus.DRAFT)
                 raise
 
             if not pdf_bytes:
-                repository.set_status(session_id, ReportStatus.DRAFT)
+                await run_in_threadpool(repository.set_status, session_id, ReportStatus.DRAFT)
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="PDF renderer returned empty output.",
                 )
 
-            repository.persist_generated_pdf(session_id, pdf_bytes)
-            repository.cleanup_session_images(session_id)
-            repository.cleanup_session_annex_documents(session_id)
+            await run_in_threadpool(repository.persist_generated_pdf, session_id, pdf_bytes)
+
+        # Uploads are no longer needed once the PDF is stored; deleting them after the
+        # response keeps the per-file unlinks off the request path
+        background_tasks.add_task(_cleanup_session_uploads, repository, session_id)
 
         return GenerateReportResponse(
             session_id=session_id,
             download_url=f"/reports/{session_id}/download",
         )
 
-    @app.get("/reports/{session_id}/download", tags=["reports"])
-    async def download_report(session_id: UUID) -> FileResponse:
+    @app.get("/reports/{session_id}/download", tags=["reports"], response_model=None)
+    async def download_report(session_id: UUID, request: Request) -> Response:
         repository: ReportRepository = app.state.report_repository
-        pdf_path = repository.get_generated_pdf_path(session_id)
-        if pdf_path is None:
+        generated_pdf = await run_in_threadpool(_stat_generated_pdf, repository, session_id)
+        if generated_pdf is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Generated report is not available for download.",
             )
 
-        return FileResponse(
+        pdf_path, pdf_stat = generated_pdf
+
+        # Passing the stat result sets ETag and Last-Modified without a second stat
+        response = FileResponse(
             path=pdf_path,
             media_type="application/pdf",
             filename=pdf_path.name,
+            stat_result=pdf_stat,
+            headers={"Cache-Control": DOWNLOAD_CACHE_CONTROL},
         )
 
+        # Generated reports are never rewritten, so a matching ETag can skip the body
+        if _etag_matches(request.headers.get("if-none-match"), response.headers["etag"]):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={
+                    "ETag": response.headers["etag"],
+                    "Cache-Control": DOWNLOAD_CACHE_CONTROL,
+                },
+            )
+
+        return response
+
     return app
 
 
+def _generation_conflict_error(current_status: ReportStatus) -> HTTPException:
+    if current_status == ReportStatus.GENERATING:
+        detail = "Report generation is already in progress."
+    else:
+        detail = "Report was already generated, but the generated PDF is no longer available."
+
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+
+    # If-None-Match compares weakly: it may list several tags, each optionally W/-prefixed
+    candidate_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidate_tags or etag.removeprefix("W/") in candidate_tags
+
+
+def _stat_generated_pdf(
+    repository: ReportRepository, session_id: UUID
+) -> tuple[Path, stat_result] | None:
+    pdf_path = repository.get_generated_pdf_path(session_id)
+    if pdf_path is None:
+        return None
+
+    try:
+        return pdf_path, stat(pdf_path)
+    except FileNotFoundError:
+        return None
+
+
 def _require_session(repository: ReportRepository, session_id: UUID) -> ReportSession:
     session = repository.get_session(session_id)
     if session is None:
@@ -360,10 +506,12 @@ def _require_session(repository: ReportRepository, session_id: UUID) -> ReportSe
 
 def _validate_image_mime_type(image: UploadFile) -> None:
     if image.content_type not in ALLOWED_IMAGE_MIME_TYPES:
-        allowed_types = ", ".join(sorted(ALLOWED_IMAGE_MIME_TYPES))
         raise HTTPException(
             status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            detail=f"Unsupported image type '{image.content_type}'. Allowed types: {allowed_types}.",
+            detail=(
+                f"Unsupported image type '{image.content_type}'. "
+                f"Allowed types: {ALLOWED_IMAGE_MIME_TYPES_TEXT}."
+            ),
         )
 
 
@@ -377,10 +525,12 @@ def _validate_annex_mime_type(document: UploadFile) -> None:
     if filename.endswith(".pdf"):
         return
 
-    allowed_types = ", ".join(sorted(ALLOWED_ANNEX_MIME_TYPES))
     raise HTTPException(
         status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-        detail=f"Unsupported annex type '{content_type}'. Allowed types: {allowed_types}.",
+        detail=(
+            f"Unsupported annex type '{content_type}'. "
+            f"Allowed types: {ALLOWED_ANNEX_MIME_TYPES_TEXT}."
+        ),
     )
 
 
@@ -405,34 +555,171 @@ def _validate_annex_pdf(source: BinaryIO) -> None:
         source.seek(0)
 
 
-def _get_upload_size(source: BinaryIO) -> int:
-    source.seek(0, SEEK_END)
-    size = source.tell()
-    source.seek(0)
-    return size
+async def _read_upload(upload: UploadFile, *, limit: int) -> bytes | None:
+    # The multipart parser already counted the spooled bytes, so oversized files are never read
+    if upload.size is not None and upload.size > limit:
+        return None
 
+    chunks: list[bytes] = []
+    total = 0
+    while chunk := await upload.read(UPLOAD_READ_CHUNK_SIZE):
+        total += len(chunk)
+        if total > limit:
+            return None
+        chunks.append(chunk)
 
-def _get_image_dimensions(source: BinaryIO) -> tuple[int, int]:
-    source.seek(0)
+    return b"".join(chunks)
+
+
+def _get_image_dimensions(content: bytes) -> tuple[int, int]:
+    dimensions = _probe_image_dimensions(content)
+    if dimensions is not None:
+        return dimensions
 
     try:
-        with Image.open(source) as pil_image:
+        with Image.open(BytesIO(content), formats=PIL_IMAGE_FORMATS) as pil_image:
             width, height = pil_image.size
+    except Image.DecompressionBombError as exc:
+        raise _image_too_large_error() from exc
     except (UnidentifiedImageError, OSError) as exc:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
             detail="Uploaded file is not a valid image.",
         ) from exc
-    finally:
-        source.seek(0)
 
     return width, height
 
 
+def _probe_image_dimensions(content: bytes) -> tuple[int, int] | None:
+    try:
+        if content.startswith(PNG_SIGNATURE):
+            dimensions = _probe_png_dimensions(content)
+        elif content.startswith(b"\xff\xd8"):
+            dimensions = _probe_jpeg_dimensions(content)
+        elif content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+            dimensions = _probe_webp_dimensions(content)
+        else:
+            return None
+    except (IndexError, struct.error):
+        return None
+
+    if dimensions is None or min(dimensions) <= 0:
+        return None
+
+    return dimensions
+
+
+def _probe_png_dimensions(content: bytes) -> tuple[int, int] | None:
+    if content[12:16] != b"IHDR":
+        return None
+
+    width, height = struct.unpack_from(">II", content, 16)
+    return width, height
+
+
+def _probe_jpeg_dimensions(content: bytes) -> tuple[int, int] | None:
+    offset = 2
+    while offset + 9 <= len(content):
+        if content[offset] != 0xFF:
+            return None
+
+        marker = content[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", content, offset + 5)
+            return width, height
+
+        (segment_length,) = struct.unpack_from(">H", content, offset + 2)
+        offset += 2 + segment_length
+
+    return None
+
+
+def _probe_webp_dimensions(content: bytes) -> tuple[int, int] | None:
+    chunk_type = content[12:16]
+    if chunk_type == b"VP8 " and content[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack_from("<HH", content, 26)
+        return width & 0x3FFF, height & 0x3FFF
+
+    if chunk_type == b"VP8L" and content[20] == 0x2F:
+        (bits,) = struct.unpack_from("<I", content, 21)
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+
+    if chunk_type == b"VP8X" and len(content) >= 30:
+        width = int.from_bytes(content[24:27], "little") + 1
+        height = int.from_bytes(content[27:30], "little") + 1
+        return width, height
+
+    return None
+
+
+def _downscale_image(content: bytes) -> tuple[bytes, int, int]:
+    try:
+        with Image.open(BytesIO(content), formats=PIL_IMAGE_FORMATS) as pil_image:
+            image_format = pil_image.format
+            # For JPEG, thumbnail() first lets the decoder scale down by 1/2, 1/4 or 1/8
+            pil_image.thumbnail(
+                (MAX_IMAGE_LONGEST_SIDE, MAX_IMAGE_LONGEST_SIDE), Image.Resampling.BILINEAR
+            )
+            # Re-encoding drops EXIF, so camera rotation is baked into the pixels instead
+            ImageOps.exif_transpose(pil_image, in_place=True)
+            buffer = BytesIO()
+            # Keep the uploaded format so the stored file extension still matches its content
+            pil_image.save(
+                buffer, format=image_format, **DOWNSCALE_SAVE_OPTIONS.get(image_format or "", {})
+            )
+            width, height = pil_image.size
+    except Image.DecompressionBombError as exc:
+        raise _image_too_large_error() from exc
+    except (UnidentifiedImageError, OSError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Uploaded file is not a valid image.",
+        ) from exc
+
+    return buffer.getvalue(), width, height
+
+
+def _image_too_large_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="Image exceeds the 50 megapixel limit.",
+    )
+
+
+def _store_image(
+    repository: ReportRepository,
+    session_id: UUID,
+    *,
+    group_name: PhotoGroupName,
+    content: bytes,
+    original_filename: str,
+) -> ImageMeta:
+    width, height = _get_image_dimensions(content)
+    if width * height > MAX_IMAGE_PIXELS:
+        raise _image_too_large_error()
+
+    if max(width, height) > MAX_IMAGE_LONGEST_SIDE:
+        content, width, height = _downscale_image(content)
+
+    return repository.save_image(
+        session_id,
+        group_name=group_name,
+        source=BytesIO(content),
+        original_filename=original_filename,
+        size_bytes=len(content),
+        width=width,
+        height=height,
+        max_total_upload_bytes=MAX_SESSION_SIZE_BYTES,
+    )
+
+
 def _resolve_default_data_root() -> Path:
-    source_root = Path(__file__).resolve().parents[2]
-    if source_root.name == "src":
-        return source_root.parent / "data"
+    if SOURCE_ROOT.name == "src":
+        return SOURCE_ROOT.parent / "data"
 
     return Path.cwd() / "data"
 
@@ -470,6 +757,31 @@ def _build_default_renderer(repository: ReportRepository) -> ActivityReportPdfRe
     return UnconfiguredActivityReportPdfRenderer()
 
 
+def _render_credits(session: ReportSession) -> int:
+    base_credits = RENDER_CREDIT_TOTAL // RENDER_CONCURRENCY_LIMIT
+    return base_credits + session.total_upload_bytes // RENDER_CREDIT_UPLOAD_BYTES
+
+
+def _build_default_render_executor(renderer: ActivityReportPdfRenderer) -> Executor | None:
+    if isinstance(renderer, WeasyPrintActivityReportPdfRenderer):
+        # WeasyPrint layout holds the GIL, so renders only run in parallel across processes.
+        # Spawned workers avoid forking a process that already runs event loop threads, and
+        # each one warms WeasyPrint up once so requests never pay for font loading.
+        return ProcessPoolExecutor(
+            max_workers=RENDER_CONCURRENCY_LIMIT,
+            mp_context=get_context("spawn"),
+            initializer=warm_up_weasyprint,
+        )
+
+    return None
+
+
+def _cleanup_session_uploads(repository: ReportRepository, session_id: UUID) -> None:
+    with suppress(SessionNotFoundError):
+        repository.cleanup_session_images(session_id)
+        repository.cleanup_session_annex_documents(session_id)
+
+
 async def _run_session_cleanup_loop(
     *,
     repository: ReportRepository,
@@ -479,8 +791,10 @@ async def _run_session_cleanup_loop(
     max_age = timedelta(seconds=session_ttl_seconds)
 
     while True:
-        repository.cleanup_expired_sessions(max_age=max_age)
-        await asyncio.sleep(cleanup_interval_seconds)
+        await run_in_threadpool(repository.cleanup_expired_sessions, max_age=max_age)
+        # Jitter keeps replicas sharing a data root from sweeping it in lockstep
+        jitter = uniform(-SESSION_CLEANUP_JITTER_RATIO, SESSION_CLEANUP_JITTER_RATIO)
+        await asyncio.sleep(cleanup_interval_seconds * (1 + jitter))
 
 
 app = create_app()
@@ -1,20 +1,44 @@
+import os
+import threading
+from base64 import b64encode
 from calendar import month_name
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from html import escape
+from functools import cache, partial
 from io import BytesIO
+from mimetypes import guess_type
+from multiprocessing import get_context
 from pathlib import Path
-from typing import Protocol
+from typing import BinaryIO, Protocol
+from urllib.parse import quote, unquote
 
+from markupsafe import escape
 from pypdf import PdfReader, PdfWriter
-from weasyprint import HTML
-
-from reportr.storage import AnnexGroupName, PhotoGroupName, ReportFormFields, ReportSession
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+from weasyprint.urls import URLFetcher, URLFetcherResponse
+
+from reportr.storage import (
+    AnnexGroupName,
+    ImageMeta,
+    PhotoGroupName,
+    ReportFormFields,
+    ReportSession,
+)
 
 
 @dataclass(frozen=True, slots=True)
-class _ImageInfo:
-    uri: str
-    is_landscape: bool
+class _GroupPhotos:
+    # Parallel columns rather than one object per image, so grids zip plain tuples
+    uris: tuple[str, ...]
+    is_landscape: tuple[bool, ...]
+    landscape: tuple[str, ...]
+    portrait: tuple[str, ...]
+
+
+_NO_PHOTOS = _GroupPhotos(uris=(), is_landscape=(), landscape=(), portrait=())
+_PHOTO_GROUPS_BY_VALUE = {group_name.value: group_name for group_name in PhotoGroupName}
 
 
 @dataclass(frozen=True, slots=True)
@@ -62,674 +86,686 @@ _ANNEX_SECTIONS: tuple[_AnnexSectionInfo, ...] = (
     ),
 )
 
-
-class ActivityReportPdfRenderer(Protocol):
-    def render(self, session: ReportSession, *, allow_incomplete: bool = False) -> bytes:
-        """Render a report session into PDF bytes."""
-        ...
+_COMPANY_LOGO_PATH = Path(__file__).resolve().parents[2] / "frontend" / "public" / "asset-80.svg"
 
 
-class RendererNotReadyError(RuntimeError):
-    pass
+@dataclass(frozen=True, slots=True)
+class _FigureDef:
+    caption: str
+    group_name: PhotoGroupName
+    contain_images: bool = False
+
+
+# (title_suffix, blocks): str blocks are paragraph templates, _FigureDef blocks are figures
+_SubsectionDef = tuple[str, tuple[str | _FigureDef, ...]]
+
+_SECTION_CLOSE = "\n</section>\n"
+
+# Grid classes keyed by (image count, all portrait); counts not listed use the three-column grid
+_GRID_CLASS_MARKUP: dict[tuple[int, bool], str] = {
+    (1, False): "figure__grid figure__grid--single",
+    (1, True): "figure__grid figure__grid--single",
+    (2, False): "figure__grid",
+    (2, True): "figure__grid figure__grid--portrait-pair",
+    (4, False): "figure__grid",
+    (4, True): "figure__grid figure__grid--portrait-pair",
+}
+_GRID_CLASS_MARKUP_LARGE = "figure__grid figure__grid--single"
+_GRID_CLASS_MARKUP_DEFAULT = "figure__grid figure__grid--three"
+
+# (landscape, portrait) image classes keyed by (large, contain_images)
+_IMAGE_CLASS_MARKUP: dict[tuple[bool, bool], tuple[str, str]] = {
+    (False, False): (
+        "figure__img figure__img--landscape",
+        "figure__img figure__img--portrait",
+    ),
+    (False, True): (
+        "figure__img figure__img--contain figure__img--landscape",
+        "figure__img figure__img--contain figure__img--portrait",
+    ),
+    (True, False): (
+        "figure__img figure__img--large figure__img--landscape",
+        "figure__img figure__img--large figure__img--portrait",
+    ),
+    (True, True): (
+        "figure__img figure__img--large figure__img--contain figure__img--landscape",
+        "figure__img figure__img--large figure__img--contain figure__img--portrait",
+    ),
+}
+
+
+_REPORT_CSS = """
+@page {
+  size: A4;
+  margin: 16mm;
+}
+
+@page cover {
+  margin: 16mm;
+}
+
+@page report {
+  margin: 40mm 16mm 20mm;
+  @top-center {
+    content: element(report-header);
+    width: 100%;
+  }
+}
+
+@page report:first {
+  counter-reset: page 1;
+}
+
+* {
+  box-sizing: border-box;
+}
+
+body {
+  margin: 0;
+  color: #1b1b1b;
+  font: 12px/1.6 "Times New Roman", Times, serif;
+  background: #ffffff;
+}
+
+strong {
+  font-weight: 700;
+}
+
+.cover {
+  page: cover;
+  height: 265mm;
+  border: 1px solid #cbcbcb;
+  background: #ffffff;
+  padding: 10mm;
+  display: flex;
+  flex-direction: column;
+  align-items: center;
+  text-align: center;
+  gap: 6mm;
+}
+
+.cover__title {
+  margin: 0;
+  font: 700 28pt/1.1 "Times New Roman", Times, serif;
+  letter-spacing: 0.04em;
+  text-transform: uppercase;
+}
+
+.cover__image-wrap {
+  width: 100%;
+  border: 1px solid #cbcbcb;
+  background: #e9eef5;
+  padding: 3.5mm;
+  display: flex;
+  justify-content: center;
+}
+
+.cover__image {
+  width: 100%;
+  max-height: 125mm;
+  object-fit: contain;
+}
+
+.cover__building {
+  margin: 0;
+  font: 700 16pt/1.35 "Times New Roman", Times, serif;
+}
+
+.cover__date {
+  margin: 0;
+  font: 700 13pt/1.2 "Times New Roman", Times, serif;
+}
+
+.cover__spacer {
+  flex: 1 1 auto;
+}
+
+.cover__logo-wrap {
+  width: 120mm;
+  display: flex;
+  justify-content: center;
+}
+
+.cover__logo {
+  width: 100%;
+  height: auto;
+}
+
+.cover__logo-fallback {
+  margin: 0;
+  font-weight: 700;
+}
+
+.report {
+  page: report;
+  break-before: page;
+}
+
+.report-header {
+  position: running(report-header);
+  border-bottom: 1px solid #1f1f1f;
+  padding-bottom: 2.5mm;
+  font: 11px/1.2 "Times New Roman", Times, serif;
+}
+
+.report-header__logo-wrap {
+  margin-bottom: 1.2mm;
+}
+
+.report-header__meta {
+}
+
+.report-header__row + .report-header__row {
+  margin-top: 0.4mm;
+}
+
+.report-header__row {
+  display: grid;
+  grid-template-columns: minmax(0, 1fr) auto;
+  column-gap: 5mm;
+  align-items: baseline;
+}
+
+.report-header__logo {
+  width: 30mm;
+  height: auto;
+}
+
+.report-header__logo-fallback {
+  margin: 0;
+  font-weight: 700;
+}
+
+.report-header__line {
+  margin: 0;
+  font-size: 11px;
+}
+
+.report-header__line--title,
+.report-header__line--report {
+  font-weight: 700;
+}
+
+.report-header__line--building,
+.report-header__line--page {
+  font-size: 11px;
+}
+
+.report-header__line--building {
+  white-space: normal;
+}
+
+.report-header__page-number::after {
+  content: counter(page);
+}
+
+.section {
+  margin: 0 0 3mm;
+}
+
+.chapter-heading {
+  margin: 5mm 0 4mm;
+  padding-left: 3mm;
+  border-left: 1mm solid #f7550a;
+  font: 700 18pt/1.2 "Times New Roman", Times, serif;
+  text-transform: uppercase;
+}
+
+.chapter-heading--standalone {
+  margin-top: 8mm;
+}
+
+.subsection-heading {
+  margin: 4mm 0 3mm;
+  font: 700 13.5pt/1.2 "Times New Roman", Times, serif;
+  break-after: avoid;
+  page-break-after: avoid;
+}
+
+.section__paragraph {
+  margin: 0 0 3mm;
+  text-align: justify;
+}
+
+.figure {
+  margin: 2.4mm 0 3mm;
+  break-inside: avoid;
+  page-break-inside: avoid;
+}
+
+.figure__grid {
+  display: grid;
+  grid-template-columns: repeat(2, minmax(0, 1fr));
+  gap: 2.4mm;
+  align-items: start;
+  break-inside: avoid;
+  page-break-inside: avoid;
+}
+
+.figure__grid + .figure__grid {
+  margin-top: 2.4mm;
+}
+
+.figure__grid--single {
+  grid-template-columns: minmax(0, 1fr);
+}
+
+.figure__grid--three {
+  grid-template-columns: repeat(3, minmax(0, 1fr));
+}
+
+.figure__grid--portrait-pair {
+  grid-template-columns: repeat(2, minmax(0, 60mm));
+  justify-content: center;
+  column-gap: 1.8mm;
+}
+
+.figure__item {
+  break-inside: avoid;
+  page-break-inside: avoid;
+}
+
+.figure__img {
+  display: block;
+  width: 100%;
+  object-fit: contain;
+}
+
+.figure__img--landscape {
+  height: 55mm;
+}
+
+.figure__img--portrait {
+  height: 75mm;
+}
+
+.figure__grid--three .figure__img--landscape {
+  height: 45mm;
+}
+
+.figure__grid--three .figure__img--portrait {
+  height: 60mm;
+}
+
+.figure__img--contain {
+  height: auto;
+  max-height: 82mm;
+}
+
+.figure__img--large {
+  width: 100%;
+  max-height: 96mm;
+}
+
+.figure__caption {
+  margin: 1.8mm 0 0;
+  text-align: center;
+  font: 700 10pt/1.2 "Times New Roman", Times, serif;
+  break-inside: avoid;
+  page-break-inside: avoid;
+}
+
+.figure__missing {
+  margin: 0;
+  text-align: center;
+  font-style: italic;
+}
+
+.signature {
+  margin-top: 12mm;
+  border-top: 1px solid #1f1f1f;
+  padding-top: 6mm;
+}
+
+.signature__label,
+.signature__role {
+  margin: 0;
+}
+
+.signature__name {
+  margin: 4mm 0 0;
+  font-weight: 700;
+}
+"""
 
+_ANNEX_COVER_CSS = """
+@page {
+  size: A4;
+  margin: 40mm 16mm 20mm;
+  @top-center {
+    content: element(report-header);
+    width: 100%;
+  }
+}
+
+* {
+  box-sizing: border-box;
+}
+
+body {
+  margin: 0;
+  color: #1b1b1b;
+  font: 12px/1.6 "Times New Roman", Times, serif;
+  background: #ffffff;
+}
+
+.annex-cover {
+  min-height: 237mm;
+  display: flex;
+  flex-direction: column;
+}
+
+.report-header {
+  position: running(report-header);
+  border-bottom: 1px solid #1f1f1f;
+  padding-bottom: 2.5mm;
+  font: 11px/1.2 "Times New Roman", Times, serif;
+}
+
+.report-header__logo-wrap {
+  margin-bottom: 1.2mm;
+}
+
+.report-header__row + .report-header__row {
+  margin-top: 0.4mm;
+}
+
+.report-header__row {
+  display: grid;
+  grid-template-columns: minmax(0, 1fr) auto;
+  column-gap: 5mm;
+  align-items: baseline;
+}
+
+.report-header__logo {
+  width: 30mm;
+  height: auto;
+}
+
+.report-header__logo-fallback {
+  margin: 0;
+  font-weight: 700;
+}
+
+.report-header__line {
+  margin: 0;
+  font-size: 11px;
+}
+
+.report-header__line--title,
+.report-header__line--report {
+  font-weight: 700;
+}
+
+.report-header__line--building {
+  white-space: normal;
+}
+
+.annex-cover__body {
+  flex: 1 1 auto;
+  display: flex;
+  flex-direction: column;
+  justify-content: center;
+  align-items: center;
+  text-align: center;
+  gap: 4mm;
+}
+
+.annex-cover__title {
+  margin: 0;
+  font: 700 36pt/1.1 "Times New Roman", Times, serif;
+  text-transform: uppercase;
+  letter-spacing: 0.08em;
+}
+
+.annex-cover__subtitle {
+  margin: 0;
+  font: 700 13pt/1.3 "Times New Roman", Times, serif;
+}
+"""
 
-class UnconfiguredActivityReportPdfRenderer:
-    def render(self, session: ReportSession, *, allow_incomplete: bool = False) -> bytes:
-        _ = session, allow_incomplete
-        raise RendererNotReadyError(
-            "Activity report renderer is not configured yet. "
-            "Implement activity_report_pdf_renderer before calling generate."
-        )
+# Report prose; {slots} are filled with already-escaped values
+_INTRODUCTION_OPENING_PARAGRAPH_TEMPLATE = (
+    "SBStruc Engineering conducted destructive testing, non-destructive testing, and "
+    "foundation excavation on the existing "
+    "<strong>{storey_count}-storey building, {building_name}</strong>, located in "
+    "<strong>{building_location}</strong>."
+)
 
+_INTRODUCTION_CLOSING_PARAGRAPH = (
+    "This work was undertaken solely to gather data and information on the existing "
+    "building. Concrete core extraction and rebar extraction were performed to obtain "
+    "samples for the determination of concrete and reinforcing steel properties, "
+    "respectively. Non-destructive testing, including rebar scanning and rebound hammer "
+    "testing, was also carried out to collect additional data on concrete characteristics, "
+    "identify rebar sizes, and document the probable quantity and layout of reinforcement "
+    "within the building's structural components. Chipping of selected portions of the "
+    "existing slab was conducted to verify the existing reinforcement. Excavation works "
+    "were conducted to gather data on the existing foundation."
+)
 
-class WeasyPrintActivityReportPdfRenderer:
-    def __init__(self, *, sessions_root: Path = Path("data/sessions")) -> None:
-        self._sessions_root = sessions_root
+_B1_PARAGRAPH_TEMPLATE = (
+    "Rebar scanning was performed using non-destructive testing methods to determine the "
+    "quantity, spacing, and approximate diameter of reinforcing steel bars embedded within "
+    "the concrete elements. This activity was carried out to verify reinforcement detailing "
+    "and support the structural assessment without causing damage to the members. A total "
+    "of <strong>{rebar_scan_locations} rebar scan locations</strong> were evaluated, "
+    "and initial rebar data were recorded on site during the scanning process. The "
+    "compiled results for the selected structural members are presented in "
+    "<strong>Annex I</strong>."
+)
 
-    def render(self, session: ReportSession, *, allow_incomplete: bool = False) -> bytes:
-        if session.form_fields is None:
-            raise RendererNotReadyError("Report session has no form fields to render.")
+_B2_PARAGRAPH_TEMPLATE = (
+    "Non-destructive testing using the Rebound Hammer Test was conducted on selected "
+    "structural members to assess the uniformity and relative quality of the in-situ "
+    "concrete strength, as indicated by the measured Q-values. A total of "
+    "<strong>{rebound_test_locations} test locations</strong> were evaluated and "
+    "distributed across the structure. At each test location, ten (10) rebound hammer "
+    "impacts were applied in accordance with standard testing procedures consistent with "
+    "ASTM C805. The rebound numbers obtained were statistically analyzed, with mean "
+    "values calculated for each structural member. A summary of the rebound number test "
+    "results is presented in <strong>Annex II</strong>."
+)
 
-        html = self._build_html(session, allow_incomplete=allow_incomplete)
-        report_pdf_bytes = HTML(
-            string=html, base_url=self._sessions_root.resolve().as_uri()
-        ).write_pdf()
-        if report_pdf_bytes is None:
-            raise RendererNotReadyError("Activity report renderer returned no PDF bytes.")
+_B3_PARAGRAPH_TEMPLATE = (
+    "Concrete core extraction was conducted on selected structural members to obtain "
+    "representative samples of the building's in-situ concrete. A total of "
+    "<strong>{core_extraction_locations} cores</strong> were extracted. The specimens "
+    "were used to assess concrete quality, including compressive strength and overall "
+    "material condition. Compressive strength testing was performed in accordance with "
+    "ASTM C42/C42M, and the corresponding results are presented in <strong>Annex "
+    "III</strong>."
+)
 
-        if not self._has_annex_documents(session):
-            return report_pdf_bytes
+_B4_PARAGRAPH_INTRO_TEMPLATE = (
+    "Rebar extraction was carried out on selected structural members to obtain "
+    "representative reinforcement samples from the building's structural system. A total "
+    "of <strong>{rebar_samples} rebar samples</strong> were extracted."
+)
 
-        return self._merge_report_with_annex_documents(session, report_pdf_bytes)
+_B4_PARAGRAPH_CLOSE = (
+    "The extracted rebars were evaluated to determine their material properties, including "
+    "tensile strength. The tensile test results are presented in <strong>Annex IV</strong>."
+)
 
-    def _build_html(self, session: ReportSession, *, allow_incomplete: bool = False) -> str:
-        if session.form_fields is None:
-            raise RendererNotReadyError("Report session has no form fields to render.")
+_B5_PARAGRAPH = (
+    "Chipping of the existing slab at one selected location was conducted to verify the "
+    "reinforcement size."
+)
 
-        form: ReportFormFields = session.form_fields
+_B6_PARAGRAPH_TEMPLATE = (
+    "Following the completion of concrete coring, rebar extraction, and chipping of slab, "
+    "reinstatement works were carried out to restore the affected structural elements and "
+    "ensure continuity of structural performance. Structural components from which samples "
+    "were extracted were restored to their original condition. Removed reinforcement was "
+    "replaced with new rebars of equivalent diameter and grade to maintain structural "
+    "capacity. Concrete that was chipped or removed during the verification and extraction "
+    "process was reinstated using <strong>{grout_product}</strong> non-shrink grout, "
+    "with proper bonding between existing and new concrete ensured through the application "
+    "of <strong>{epoxy_product}</strong> structural adhesive."
+)
 
-        testing_month = _format_testing_month(form.building_details.testing_date)
-        building_name = escape(form.building_details.building_name)
-        building_location = escape(form.building_details.building_location)
-        logo_uri = self._company_logo_uri()
+_C1_PARAGRAPH_TEMPLATE = (
+    "Concrete core extraction was conducted at "
+    "<strong>{foundation_locations} selected foundation locations</strong> to obtain "
+    "representative samples of the building's in-situ concrete. A total of "
+    "<strong>{foundation_cores} cores</strong> were extracted. The specimens were used "
+    "to determine concrete properties, including compressive strength. Compressive strength "
+    "testing was performed in accordance with ASTM C42/C42M, and the results are "
+    "presented in <strong>Annex V</strong>."
+)
 
-        cover_photo = self._first_image_uri(session, PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO)
-        building_photos = self._all_image_info(
-            session, PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO
-        )
+_C2_PARAGRAPH = (
+    "Rebar scanning was performed using non-destructive testing methods to determine the "
+    "quantity, spacing, and approximate diameter of reinforcing steel bars embedded within "
+    "the concrete foundation. The initial rebar data were recorded on site during the "
+    "scanning process. The compiled results for the foundation are presented in "
+    "<strong>Annex VI</strong>."
+)
 
-        storey_count = _number_to_words(form.building_details.number_of_storey)
-        rebar_scan_locations = _words_with_digits(
-            form.superstructure.rebar_scanning.number_of_rebar_scan_locations
-        )
-        rebound_test_locations = _words_with_digits(
-            form.superstructure.rebound_hammer_test.number_of_rebound_hammer_test_locations
-        )
-        core_extraction_locations = _words_with_digits(
-            form.superstructure.concrete_core_extraction.number_of_coring_locations
-        )
-        rebar_samples = _words_with_digits(
-            form.superstructure.rebar_extraction.number_of_rebar_samples_extracted
-        )
-        foundation_locations = (
-            _words_with_digits(
-                form.substructure.concrete_core_extraction.number_of_foundation_locations
-            )
-            if form.substructure is not None
-            else "zero (0)"
-        )
-        foundation_cores = (
-            _words_with_digits(
-                form.substructure.concrete_core_extraction.number_of_foundation_cores_extracted
-            )
-            if form.substructure is not None
-            else "zero (0)"
-        )
-        grout_product = escape(form.superstructure.restoration_works.non_shrink_grout_product_used)
-        epoxy_product = escape(form.superstructure.restoration_works.epoxy_ab_used)
-
-        introduction_opening_paragraph = (
-            "SBStruc Engineering conducted destructive testing, non-destructive testing, and "
-            "foundation excavation on the existing "
-            f"<strong>{storey_count}-storey building, {building_name}</strong>, located in "
-            f"<strong>{building_location}</strong>."
-        )
-        introduction_closing_paragraph = (
-            "This work was undertaken solely to gather data and information on the existing "
-            "building. Concrete core extraction and rebar extraction were performed to obtain "
-            "samples for the determination of concrete and reinforcing steel properties, "
-            "respectively. Non-destructive testing, including rebar scanning and rebound hammer "
-            "testing, was also carried out to collect additional data on concrete characteristics, "
-            "identify rebar sizes, and document the probable quantity and layout of reinforcement "
-            "within the building's structural components. Chipping of selected portions of the "
-            "existing slab was conducted to verify the existing reinforcement. Excavation works "
-            "were conducted to gather data on the existing foundation."
-        )
-        b1_paragraph = (
-            "Rebar scanning was performed using non-destructive testing methods to determine the "
-            "quantity, spacing, and approximate diameter of reinforcing steel bars embedded within "
-            "the concrete elements. This activity was carried out to verify reinforcement detailing "
-            "and support the structural assessment without causing damage to the members. A total "
-            f"of <strong>{rebar_scan_locations} rebar scan locations</strong> were evaluated, "
-            "and initial rebar data were recorded on site during the scanning process. The "
-            "compiled results for the selected structural members are presented in "
-            "<strong>Annex I</strong>."
-        )
-        b2_paragraph = (
-            "Non-destructive testing using the Rebound Hammer Test was conducted on selected "
-            "structural members to assess the uniformity and relative quality of the in-situ "
-            "concrete strength, as indicated by the measured Q-values. A total of "
-            f"<strong>{rebound_test_locations} test locations</strong> were evaluated and "
-            "distributed across the structure. At each test location, ten (10) rebound hammer "
-            "impacts were applied in accordance with standard testing procedures consistent with "
-            "ASTM C805. The rebound numbers obtained were statistically analyzed, with mean "
-            "values calculated for each structural member. A summary of the rebound number test "
-            "results is presented in <strong>Annex II</strong>."
-        )
-        b3_paragraph = (
-            "Concrete core extraction was conducted on selected structural members to obtain "
-            "representative samples of the building's in-situ concrete. A total of "
-            f"<strong>{core_extraction_locations} cores</strong> were extracted. The specimens "
-            "were used to assess concrete quality, including compressive strength and overall "
-            "material condition. Compressive strength testing was performed in accordance with "
-            "ASTM C42/C42M, and the corresponding results are presented in <strong>Annex "
-            "III</strong>."
-        )
-        b4_paragraph_intro = (
-            "Rebar extraction was carried out on selected structural members to obtain "
-            "representative reinforcement samples from the building's structural system. A total "
-            f"of <strong>{rebar_samples} rebar samples</strong> were extracted."
-        )
-        b4_paragraph_close = (
-            "The extracted rebars were evaluated to determine their material properties, including "
-            "tensile strength. The tensile test results are presented in <strong>Annex IV</strong>."
-        )
-        b5_paragraph = (
-            "Chipping of the existing slab at one selected location was conducted to verify the "
-            "reinforcement size."
-        )
-        b6_paragraph = (
-            "Following the completion of concrete coring, rebar extraction, and chipping of slab, "
-            "reinstatement works were carried out to restore the affected structural elements and "
-            "ensure continuity of structural performance. Structural components from which samples "
-            "were extracted were restored to their original condition. Removed reinforcement was "
-            "replaced with new rebars of equivalent diameter and grade to maintain structural "
-            "capacity. Concrete that was chipped or removed during the verification and extraction "
-            f"process was reinstated using <strong>{grout_product}</strong> non-shrink grout, "
-            "with proper bonding between existing and new concrete ensured through the application "
-            f"of <strong>{epoxy_product}</strong> structural adhesive."
-        )
-        c1_paragraph = (
-            "Concrete core extraction was conducted at "
-            f"<strong>{foundation_locations} selected foundation locations</strong> to obtain "
-            "representative samples of the building's in-situ concrete. A total of "
-            f"<strong>{foundation_cores} cores</strong> were extracted. The specimens were used "
-            "to determine concrete properties, including compressive strength. Compressive strength "
-            "testing was performed in accordance with ASTM C42/C42M, and the results are "
-            "presented in <strong>Annex V</strong>."
-        )
-        c2_paragraph = (
-            "Rebar scanning was performed using non-destructive testing methods to determine the "
-            "quantity, spacing, and approximate diameter of reinforcing steel bars embedded within "
-            "the concrete foundation. The initial rebar data were recorded on site during the "
-            "scanning process. The compiled results for the foundation are presented in "
-            "<strong>Annex VI</strong>."
-        )
-        c3_paragraph = (
-            "Following the concrete core extraction, the excavated foundation areas were "
-            "backfilled using the previously removed soils and compacted to restore the "
-            "foundation to its original profile."
-        )
+_C3_PARAGRAPH = (
+    "Following the concrete core extraction, the excavated foundation areas were "
+    "backfilled using the previously removed soils and compacted to restore the "
+    "foundation to its original profile."
+)
 
-        # Build subsection definitions for B (superstructure) and C (substructure).
-        # Each entry: (title_suffix, body_markup, photo_groups_used)
-        # photo_groups_used is used to decide whether to include the subsection
-        # when allow_incomplete is True.
-
-        b_subsection_defs: list[tuple[str, str, list[PhotoGroupName]]] = [
-            (
-                "Rebar Scanning",
-                self._paragraph(b1_paragraph)
-                + self._figure(
-                    "Figure {fig}. REBAR SCANNING",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUPERSTRUCTURE_REBAR_SCANNING_PHOTOS
-                    ),
-                ),
-                [PhotoGroupName.SUPERSTRUCTURE_REBAR_SCANNING_PHOTOS],
-            ),
-            (
-                "Rebound Hammer Test",
-                self._paragraph(b2_paragraph)
-                + self._figure(
-                    "Figure {fig}. REBOUND HAMMER TESTS",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUPERSTRUCTURE_REBOUND_HAMMER_TEST_PHOTOS
-                    ),
-                ),
-                [PhotoGroupName.SUPERSTRUCTURE_REBOUND_HAMMER_TEST_PHOTOS],
+# Subsections of chapters B (superstructure) and C (substructure), declared once at import.
+# Paragraph templates are filled from the per-render context; the figures' photo groups
+# decide whether a subsection is included when allow_incomplete is True.
+_B_SUBSECTIONS: tuple[_SubsectionDef, ...] = (
+    (
+        "Rebar Scanning",
+        (
+            _B1_PARAGRAPH_TEMPLATE,
+            _FigureDef(
+                "Figure {fig}. REBAR SCANNING",
+                PhotoGroupName.SUPERSTRUCTURE_REBAR_SCANNING_PHOTOS,
             ),
-            (
-                "Concrete Core Extraction",
-                self._paragraph(b3_paragraph)
-                + self._figure(
-                    "Figure {fig}.1 Concrete Core Extraction",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUPERSTRUCTURE_CONCRETE_CORING_PHOTOS
-                    ),
-                )
-                + self._figure(
-                    "Figure {fig}.2 Extracted Core Samples",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUPERSTRUCTURE_CORE_SAMPLES_FAMILY_PIC
-                    ),
-                    contain_images=True,
-                ),
-                [
-                    PhotoGroupName.SUPERSTRUCTURE_CONCRETE_CORING_PHOTOS,
-                    PhotoGroupName.SUPERSTRUCTURE_CORE_SAMPLES_FAMILY_PIC,
-                ],
+        ),
+    ),
+    (
+        "Rebound Hammer Test",
+        (
+            _B2_PARAGRAPH_TEMPLATE,
+            _FigureDef(
+                "Figure {fig}. REBOUND HAMMER TESTS",
+                PhotoGroupName.SUPERSTRUCTURE_REBOUND_HAMMER_TEST_PHOTOS,
             ),
-            (
-                "Rebar Extraction",
-                self._paragraph(b4_paragraph_intro)
-                + self._figure(
-                    "Figure {fig}.1 Rebar Extraction",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUPERSTRUCTURE_REBAR_EXTRACTION_PHOTOS
-                    ),
-                )
-                + self._figure(
-                    "Figure {fig}.2 Extracted Rebar Samples",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUPERSTRUCTURE_REBAR_SAMPLES_FAMILY_PIC
-                    ),
-                )
-                + self._paragraph(b4_paragraph_close),
-                [
-                    PhotoGroupName.SUPERSTRUCTURE_REBAR_EXTRACTION_PHOTOS,
-                    PhotoGroupName.SUPERSTRUCTURE_REBAR_SAMPLES_FAMILY_PIC,
-                ],
+        ),
+    ),
+    (
+        "Concrete Core Extraction",
+        (
+            _B3_PARAGRAPH_TEMPLATE,
+            _FigureDef(
+                "Figure {fig}.1 Concrete Core Extraction",
+                PhotoGroupName.SUPERSTRUCTURE_CONCRETE_CORING_PHOTOS,
             ),
-            (
-                "Chipping of Existing Slab",
-                self._paragraph(b5_paragraph)
-                + self._figure(
-                    "Figure {fig}. Chipping of Existing Slab",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUPERSTRUCTURE_CHIPPING_OF_SLAB_PHOTOS
-                    ),
-                ),
-                [PhotoGroupName.SUPERSTRUCTURE_CHIPPING_OF_SLAB_PHOTOS],
+            _FigureDef(
+                "Figure {fig}.2 Extracted Core Samples",
+                PhotoGroupName.SUPERSTRUCTURE_CORE_SAMPLES_FAMILY_PIC,
+                contain_images=True,
             ),
-            (
-                "Restoration Works",
-                self._paragraph(b6_paragraph)
-                + self._figure(
-                    "Figure {fig}. Restoration Works",
-                    self._all_image_info(session, PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS),
-                ),
-                [PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS],
+        ),
+    ),
+    (
+        "Rebar Extraction",
+        (
+            _B4_PARAGRAPH_INTRO_TEMPLATE,
+            _FigureDef(
+                "Figure {fig}.1 Rebar Extraction",
+                PhotoGroupName.SUPERSTRUCTURE_REBAR_EXTRACTION_PHOTOS,
             ),
-        ]
-
-        c_subsection_defs: list[tuple[str, str, list[PhotoGroupName]]] = [
-            (
-                "Concrete Core Extraction",
-                self._paragraph(c1_paragraph)
-                + self._figure(
-                    "Figure {fig}. Concrete Core Extraction for Foundation",
-                    self._all_image_info(
-                        session, PhotoGroupName.SUBSTRUCTURE_CORING_FOR_FOUNDATION_PHOTOS
-                    ),
-                ),
-                [PhotoGroupName.SUBSTRUCTURE_CORING_FOR_FOUNDATION_PHOTOS],
+            _FigureDef(
+                "Figure {fig}.2 Extracted Rebar Samples",
+                PhotoGroupName.SUPERSTRUCTURE_REBAR_SAMPLES_FAMILY_PIC,
             ),
-            (
-                "Rebar Scanning",
-                self._paragraph(c2_paragraph)
-                + self._figure(
-                    "Figure {fig}. Rebar Scanning for Foundation",
-                    self._all_image_info(
-                        session,
-                        PhotoGroupName.SUBSTRUCTURE_REBAR_SCANNING_FOR_FOUNDATION_PHOTOS,
-                    ),
-                ),
-                [PhotoGroupName.SUBSTRUCTURE_REBAR_SCANNING_FOR_FOUNDATION_PHOTOS],
+            _B4_PARAGRAPH_CLOSE,
+        ),
+    ),
+    (
+        "Chipping of Existing Slab",
+        (
+            _B5_PARAGRAPH,
+            _FigureDef(
+                "Figure {fig}. Chipping of Existing Slab",
+                PhotoGroupName.SUPERSTRUCTURE_CHIPPING_OF_SLAB_PHOTOS,
             ),
-            (
-                "Restoration for Coring Works, Backfilling, and Compaction",
-                self._paragraph(c3_paragraph)
-                + self._figure(
-                    "Figure {fig}. Restoration for Coring Works, Backfilling, and Compaction",
-                    self._all_image_info(
-                        session,
-                        PhotoGroupName.SUBSTRUCTURE_RESTORATION_BACKFILLING_COMPACTION_PHOTOS,
-                    ),
-                ),
-                [PhotoGroupName.SUBSTRUCTURE_RESTORATION_BACKFILLING_COMPACTION_PHOTOS],
+        ),
+    ),
+    (
+        "Restoration Works",
+        (
+            _B6_PARAGRAPH_TEMPLATE,
+            _FigureDef(
+                "Figure {fig}. Restoration Works",
+                PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS,
             ),
-        ]
-
-        b_subsections = self._build_numbered_subsections(
-            "B", b_subsection_defs, session, allow_incomplete=allow_incomplete
-        )
-        c_subsections = self._build_numbered_subsections(
-            "C", c_subsection_defs, session, allow_incomplete=allow_incomplete
-        )
-
-        header_logo_markup = (
-            '<p class="report-header__logo-fallback">Company Logo</p>'
-            if logo_uri is None
-            else f'<img class="report-header__logo" src="{logo_uri}" alt="Company logo" />'
-        )
-        cover_logo_markup = (
-            '<p class="cover__logo-fallback">Company Logo</p>'
-            if logo_uri is None
-            else f'<img class="cover__logo" src="{logo_uri}" alt="Company logo" />'
-        )
+        ),
+    ),
+)
 
-        report_parts: list[str] = [
-            self._chapter_section(
-                "A. INTRODUCTION",
-                "".join(
-                    [
-                        self._paragraph(introduction_opening_paragraph),
-                        self._figure(
-                            form.building_details.building_name,
-                            building_photos,
-                            contain_images=True,
-                            large=True,
-                        ),
-                        self._paragraph(introduction_closing_paragraph),
-                    ]
-                ),
+_C_SUBSECTIONS: tuple[_SubsectionDef, ...] = (
+    (
+        "Concrete Core Extraction",
+        (
+            _C1_PARAGRAPH_TEMPLATE,
+            _FigureDef(
+                "Figure {fig}. Concrete Core Extraction for Foundation",
+                PhotoGroupName.SUBSTRUCTURE_CORING_FOR_FOUNDATION_PHOTOS,
             ),
-        ]
-
-        if b_subsections:
-            report_parts.append(self._chapter_heading("B. DATA GATHERING FOR SUPERSTRUCTURE"))
-            report_parts.extend(b_subsections)
+        ),
+    ),
+    (
+        "Rebar Scanning",
+        (
+            _C2_PARAGRAPH,
+            _FigureDef(
+                "Figure {fig}. Rebar Scanning for Foundation",
+                PhotoGroupName.SUBSTRUCTURE_REBAR_SCANNING_FOR_FOUNDATION_PHOTOS,
+            ),
+        ),
+    ),
+    (
+        "Restoration for Coring Works, Backfilling, and Compaction",
+        (
+            _C3_PARAGRAPH,
+            _FigureDef(
+                "Figure {fig}. Restoration for Coring Works, Backfilling, and Compaction",
+                PhotoGroupName.SUBSTRUCTURE_RESTORATION_BACKFILLING_COMPACTION_PHOTOS,
+            ),
+        ),
+    ),
+)
 
-        if c_subsections:
-            report_parts.append(self._chapter_heading("C. DATA GATHERING FOR SUBSTRUCTURE"))
-            report_parts.extend(c_subsections)
+# Numbered data-gathering chapters in document order: (figure prefix, heading, subsections)
+_NUMBERED_CHAPTERS: tuple[tuple[str, str, tuple[_SubsectionDef, ...]], ...] = (
+    ("B", "B. DATA GATHERING FOR SUPERSTRUCTURE", _B_SUBSECTIONS),
+    ("C", "C. DATA GATHERING FOR SUBSTRUCTURE", _C_SUBSECTIONS),
+)
 
-        report_body = "".join(report_parts)
 
-        return f"""
+# Page skeletons filled with str.format_map; every slot receives already-escaped markup
+_REPORT_HTML_TEMPLATE = """
 <!doctype html>
 <html lang="en">
   <head>
     <meta charset="utf-8" />
-    <style>
-      @page {{
-        size: A4;
-        margin: 16mm;
-      }}
-
-      @page cover {{
-        margin: 16mm;
-      }}
-
-      @page report {{
-        margin: 40mm 16mm 20mm;
-        @top-center {{
-          content: element(report-header);
-          width: 100%;
-        }}
-      }}
-
-      @page report:first {{
-        counter-reset: page 1;
-      }}
-
-      * {{
-        box-sizing: border-box;
-      }}
-
-      body {{
-        margin: 0;
-        color: #1b1b1b;
-        font: 12px/1.6 "Times New Roman", Times, serif;
-        background: #ffffff;
-      }}
-
-      strong {{
-        font-weight: 700;
-      }}
-
-      .cover {{
-        page: cover;
-        height: 265mm;
-        border: 1px solid #cbcbcb;
-        background: #ffffff;
-        padding: 10mm;
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        text-align: center;
-        gap: 6mm;
-      }}
-
-      .cover__title {{
-        margin: 0;
-        font: 700 28pt/1.1 "Times New Roman", Times, serif;
-        letter-spacing: 0.04em;
-        text-transform: uppercase;
-      }}
-
-      .cover__image-wrap {{
-        width: 100%;
-        border: 1px solid #cbcbcb;
-        background: #e9eef5;
-        padding: 3.5mm;
-        display: flex;
-        justify-content: center;
-      }}
-
-      .cover__image {{
-        width: 100%;
-        max-height: 125mm;
-        object-fit: contain;
-      }}
-
-      .cover__building {{
-        margin: 0;
-        font: 700 16pt/1.35 "Times New Roman", Times, serif;
-      }}
-
-      .cover__date {{
-        margin: 0;
-        font: 700 13pt/1.2 "Times New Roman", Times, serif;
-      }}
-
-      .cover__spacer {{
-        flex: 1 1 auto;
-      }}
-
-      .cover__logo-wrap {{
-        width: 120mm;
-        display: flex;
-        justify-content: center;
-      }}
-
-      .cover__logo {{
-        width: 100%;
-        height: auto;
-      }}
-
-      .cover__logo-fallback {{
-        margin: 0;
-        font-weight: 700;
-      }}
-
-      .report {{
-        page: report;
-        break-before: page;
-      }}
-
-      .report-header {{
-        position: running(report-header);
-        border-bottom: 1px solid #1f1f1f;
-        padding-bottom: 2.5mm;
-        font: 11px/1.2 "Times New Roman", Times, serif;
-      }}
-
-      .report-header__logo-wrap {{
-        margin-bottom: 1.2mm;
-      }}
-
-      .report-header__meta {{
-      }}
-
-      .report-header__row + .report-header__row {{
-        margin-top: 0.4mm;
-      }}
-
-      .report-header__row {{
-        display: grid;
-        grid-template-columns: minmax(0, 1fr) auto;
-        column-gap: 5mm;
-        align-items: baseline;
-      }}
-
-      .report-header__logo {{
-        width: 30mm;
-        height: auto;
-      }}
-
-      .report-header__logo-fallback {{
-        margin: 0;
-        font-weight: 700;
-      }}
-
-      .report-header__line {{
-        margin: 0;
-        font-size: 11px;
-      }}
-
-      .report-header__line--title,
-      .report-header__line--report {{
-        font-weight: 700;
-      }}
-
-      .report-header__line--building,
-      .report-header__line--page {{
-        font-size: 11px;
-      }}
-
-      .report-header__line--building {{
-        white-space: normal;
-      }}
-
-      .report-header__page-number::after {{
-        content: counter(page);
-      }}
-
-      .section {{
-        margin: 0 0 3mm;
-      }}
-
-      .chapter-heading {{
-        margin: 5mm 0 4mm;
-        padding-left: 3mm;
-        border-left: 1mm solid #f7550a;
-        font: 700 18pt/1.2 "Times New Roman", Times, serif;
-        text-transform: uppercase;
-      }}
-
-      .chapter-heading--standalone {{
-        margin-top: 8mm;
-      }}
-
-      .subsection-heading {{
-        margin: 4mm 0 3mm;
-        font: 700 13.5pt/1.2 "Times New Roman", Times, serif;
-        break-after: avoid;
-        page-break-after: avoid;
-      }}
-
-      .section__paragraph {{
-        margin: 0 0 3mm;
-        text-align: justify;
-      }}
-
-      .figure {{
-        margin: 2.4mm 0 3mm;
-        break-inside: avoid;
-        page-break-inside: avoid;
-      }}
-
-      .figure__grid {{
-        display: grid;
-        grid-template-columns: repeat(2, minmax(0, 1fr));
-        gap: 2.4mm;
-        align-items: start;
-        break-inside: avoid;
-        page-break-inside: avoid;
-      }}
-
-      .figure__grid + .figure__grid {{
-        margin-top: 2.4mm;
-      }}
-
-      .figure__grid--single {{
-        grid-template-columns: minmax(0, 1fr);
-      }}
-
-      .figure__grid--three {{
-        grid-template-columns: repeat(3, minmax(0, 1fr));
-      }}
-
-      .figure__grid--portrait-pair {{
-        grid-template-columns: repeat(2, minmax(0, 60mm));
-        justify-content: center;
-        column-gap: 1.8mm;
-      }}
-
-      .figure__item {{
-        break-inside: avoid;
-        page-break-inside: avoid;
-      }}
-
-      .figure__img {{
-        display: block;
-        width: 100%;
-        object-fit: contain;
-      }}
-
-      .figure__img--landscape {{
-        height: 55mm;
-      }}
-
-      .figure__img--portrait {{
-        height: 75mm;
-      }}
-
-      .figure__grid--three .figure__img--landscape {{
-        height: 45mm;
-      }}
-
-      .figure__grid--three .figure__img--portrait {{
-        height: 60mm;
-      }}
-
-      .figure__img--contain {{
-        height: auto;
-        max-height: 82mm;
-      }}
-
-      .figure__img--large {{
-        width: 100%;
-        max-height: 96mm;
-      }}
-
-      .figure__caption {{
-        margin: 1.8mm 0 0;
-        text-align: center;
-        font: 700 10pt/1.2 "Times New Roman", Times, serif;
-        break-inside: avoid;
-        page-break-inside: avoid;
-      }}
-
-      .figure__missing {{
-        margin: 0;
-        text-align: center;
-        font-style: italic;
-      }}
-
-      .signature {{
-        margin-top: 12mm;
-        border-top: 1px solid #1f1f1f;
-        padding-top: 6mm;
-      }}
-
-      .signature__label,
-      .signature__role {{
-        margin: 0;
-      }}
-
-      .signature__name {{
-        margin: 4mm 0 0;
-        font-weight: 700;
-      }}
-    </style>
   </head>
   <body>
     <section class="cover">
       <h1 class="cover__title">MATERIAL TESTING WORKS</h1>
-      <div class="cover__image-wrap">{self._cover_image_markup(cover_photo)}</div>
+      <div class="cover__image-wrap">{cover_image}</div>
       <h2 class="cover__building">{building_name}<br />{building_location}</h2>
       <h3 class="cover__date">{testing_month}</h3>
       <div class="cover__spacer"></div>
-      <div class="cover__logo-wrap">{cover_logo_markup}</div>
+      <div class="cover__logo-wrap">{cover_logo}</div>
     </section>
 
     <section class="report">
       <header class="report-header">
         <div class="report-header__logo-wrap">
-          {header_logo_markup}
+          {header_logo}
         </div>
         <div class="report-header__meta">
           <div class="report-header__row">
@@ -749,152 +785,351 @@ class WeasyPrintActivityReportPdfRenderer:
 
       <section class="signature">
         <p class="signature__label">Prepared by:</p>
-        <p class="signature__name">{escape(form.signature.prepared_by)}</p>
-        <p class="signature__role">{escape(form.signature.prepared_by_role)}</p>
+        <p class="signature__name">{prepared_by}</p>
+        <p class="signature__role">{prepared_by_role}</p>
       </section>
     </section>
   </body>
 </html>
 """
+# The body is appended between the two halves so the document is joined exactly once
+_REPORT_HTML_HEAD_TEMPLATE, _REPORT_HTML_TAIL_TEMPLATE = _REPORT_HTML_TEMPLATE.split(
+    "{report_body}"
+)
+
+_ANNEX_COVER_HTML_TEMPLATE = """
+<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+  </head>
+  <body>
+    <section class="annex-cover">
+      <header class="report-header">
+        <div class="report-header__logo-wrap">{header_logo}</div>
+        <div class="report-header__meta">
+          <div class="report-header__row">
+            <p class="report-header__line report-header__line--title">Material Testing Works</p>
+            <p class="report-header__line report-header__line--report">Annex</p>
+          </div>
+          <div class="report-header__row">
+            <p class="report-header__line report-header__line--building">{building_name}</p>
+            <p class="report-header__line">&nbsp;</p>
+          </div>
+        </div>
+      </header>
+
+      <main class="annex-cover__body">
+        <h1 class="annex-cover__title">ANNEX {annex_numeral}</h1>
+        <p class="annex-cover__subtitle">{annex_title}</p>
+      </main>
+    </section>
+  </body>
+</html>
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class _RenderResources:
+    # Stylesheets register their fonts in font_config, so the three are only used together
+    font_config: FontConfiguration
+    report_stylesheet: CSS
+    annex_cover_stylesheet: CSS
+
+
+# Built on first render rather than at import, so the API process, which hands renders to
+# worker processes, never loads fontconfig. Kept per thread because a Pango font map must not
+# be used by concurrent renders; a render process renders on one thread and builds them once
+_THREAD_RENDER_RESOURCES = threading.local()
+
+
+class _LocalFileUrlFetcher(URLFetcher):
+    # Session photos are plain file:// URIs, so they are read straight from disk instead of
+    # going through urllib's opener; every other scheme keeps WeasyPrint's default handling
+    def fetch(self, url: str, headers: dict[str, str] | None = None) -> URLFetcherResponse:
+        if not url.startswith("file://"):
+            return super().fetch(url, headers)
+
+        path = unquote(url.removeprefix("file://").partition("?")[0])
+        with open(path, "rb") as resource_file:
+            body = resource_file.read()
+        content_type = guess_type(path)[0] or "application/octet-stream"
+        return URLFetcherResponse(url, body, {"Content-Type": content_type})
+
+
+_URL_FETCHER = _LocalFileUrlFetcher()
+
+
+class ActivityReportPdfRenderer(Protocol):
+    def render(self, session: ReportSession, *, allow_incomplete: bool = False) -> bytes:
+        """Render a report session into PDF bytes."""
+        ...
+
+
+class RendererNotReadyError(RuntimeError):
+    pass
+
+
+class UnconfiguredActivityReportPdfRenderer:
+    def render(self, session: ReportSession, *, allow_incomplete: bool = False) -> bytes:
+        _ = session, allow_incomplete
+        raise RendererNotReadyError(
+            "Activity report renderer is not configured yet. "
+            "Implement activity_report_pdf_renderer before calling generate."
+        )
+
+
+class WeasyPrintActivityReportPdfRenderer:
+    def __init__(
+        self,
+        *,
+        sessions_root: Path = Path("data/sessions"),
+        optimize_images: bool = False,
+        jpeg_quality: int | None = None,
+    ) -> None:
+        self._sessions_root = sessions_root
+        # Off by default so drafts skip image recompression; a final export can opt back in
+        self._optimize_images = optimize_images
+        self._jpeg_quality = jpeg_quality
+        # Resolved once so image URIs are plain string joins instead of a resolve() per file
+        self._sessions_root_uri = sessions_root.resolve().as_uri()
+
+    def render(self, session: ReportSession, *, allow_incomplete: bool = False) -> bytes:
+        output = BytesIO()
+        self.render_to(session, output, allow_incomplete=allow_incomplete)
+        return output.getvalue()
+
+    def render_to(
+        self, session: ReportSession, target: BinaryIO, *, allow_incomplete: bool = False
+    ) -> None:
+        """Write the rendered report PDF to *target* without returning a bytes copy."""
+        if session.form_fields is None:
+            raise RendererNotReadyError("Report session has no form fields to render.")
+
+        html = HTML(
+            string=self._build_html(session, allow_incomplete=allow_incomplete),
+            base_url=self._sessions_root_uri,
+            url_fetcher=_URL_FETCHER,
+        )
+        resources = _render_resources()
+        if not self._has_annex_documents(session):
+            html.write_pdf(
+                target=target,
+                stylesheets=[resources.report_stylesheet],
+                font_config=resources.font_config,
+                optimize_images=self._optimize_images,
+                jpeg_quality=self._jpeg_quality,
+            )
+            return
+
+        # Shared by the report and every annex cover, so the logo is decoded once per render
+        image_cache: dict[str, object] = {}
+        report_pdf_bytes = html.write_pdf(
+            stylesheets=[resources.report_stylesheet],
+            font_config=resources.font_config,
+            cache=image_cache,
+            optimize_images=self._optimize_images,
+            jpeg_quality=self._jpeg_quality,
+        )
+        if report_pdf_bytes is None:
+            raise RendererNotReadyError("Activity report renderer returned no PDF bytes.")
+
+        self._merge_report_with_annex_documents(
+            session, report_pdf_bytes, target, image_cache, resources
+        )
+
+    def render_many(
+        self,
+        sessions: Iterable[ReportSession],
+        *,
+        allow_incomplete: bool = False,
+        max_workers: int | None = None,
+    ) -> list[bytes]:
+        """Render several sessions in parallel worker processes, preserving input order."""
+        pending_sessions = list(sessions)
+        if not pending_sessions:
+            return []
+
+        # WeasyPrint layout holds the GIL, so batches only scale across processes
+        with ProcessPoolExecutor(
+            max_workers=max_workers or min(len(pending_sessions), os.cpu_count() or 1),
+            mp_context=get_context("spawn"),
+        ) as executor:
+            return list(
+                executor.map(
+                    partial(self.render, allow_incomplete=allow_incomplete), pending_sessions
+                )
+            )
+
+    def _build_html(self, session: ReportSession, *, allow_incomplete: bool = False) -> str:
+        if session.form_fields is None:
+            raise RendererNotReadyError("Report session has no form fields to render.")
+
+        form: ReportFormFields = session.form_fields
+
+        testing_month = _format_testing_month(form.building_details.testing_date)
+        building_name = escape(form.building_details.building_name)
+        building_location = escape(form.building_details.building_location)
+        logo_uri = _company_logo_uri()
+
+        images_by_group = self._collect_image_info(session)
+        building_photos = images_by_group[PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO]
+        cover_photo = building_photos.uris[0] if building_photos.uris else None
+
+        introduction_opening_paragraph = _INTRODUCTION_OPENING_PARAGRAPH_TEMPLATE.format(
+            storey_count=_number_to_words(form.building_details.number_of_storey),
+            building_name=building_name,
+            building_location=building_location,
+        )
+        # Slots of the B and C paragraph templates, escaped where they carry user text
+        paragraph_context = {
+            "rebar_scan_locations": _words_with_digits(
+                form.superstructure.rebar_scanning.number_of_rebar_scan_locations
+            ),
+            "rebound_test_locations": _words_with_digits(
+                form.superstructure.rebound_hammer_test.number_of_rebound_hammer_test_locations
+            ),
+            "core_extraction_locations": _words_with_digits(
+                form.superstructure.concrete_core_extraction.number_of_coring_locations
+            ),
+            "rebar_samples": _words_with_digits(
+                form.superstructure.rebar_extraction.number_of_rebar_samples_extracted
+            ),
+            "grout_product": escape(
+                form.superstructure.restoration_works.non_shrink_grout_product_used
+            ),
+            "epoxy_product": escape(form.superstructure.restoration_works.epoxy_ab_used),
+            "foundation_locations": (
+                _words_with_digits(
+                    form.substructure.concrete_core_extraction.number_of_foundation_locations
+                )
+                if form.substructure is not None
+                else "zero (0)"
+            ),
+            "foundation_cores": (
+                _words_with_digits(
+                    form.substructure.concrete_core_extraction.number_of_foundation_cores_extracted
+                )
+                if form.substructure is not None
+                else "zero (0)"
+            ),
+        }
+
+        header_logo_markup = (
+            '<p class="report-header__logo-fallback">Company Logo</p>'
+            if logo_uri is None
+            else f'<img class="report-header__logo" src="{logo_uri}" alt="Company logo" />'
+        )
+        cover_logo_markup = (
+            '<p class="cover__logo-fallback">Company Logo</p>'
+            if logo_uri is None
+            else f'<img class="cover__logo" src="{logo_uri}" alt="Company logo" />'
+        )
+
+        # Every fragment of the document is appended here and joined once.
+        report_parts: list[str] = [
+            _REPORT_HTML_HEAD_TEMPLATE.format_map(
+                {
+                    "cover_image": self._cover_image_markup(cover_photo),
+                    "building_name": building_name,
+                    "building_location": building_location,
+                    "testing_month": testing_month,
+                    "cover_logo": cover_logo_markup,
+                    "header_logo": header_logo_markup,
+                }
+            )
+        ]
+
+        _open_section(report_parts, "h2", "chapter-heading", "A. INTRODUCTION")
+        _paragraph(report_parts, introduction_opening_paragraph)
+        _figure(
+            report_parts,
+            building_name,
+            building_photos,
+            contain_images=True,
+            large=True,
+        )
+        _paragraph(report_parts, _INTRODUCTION_CLOSING_PARAGRAPH)
+        report_parts.append(_SECTION_CLOSE)
+
+        for prefix, heading, subsections in _NUMBERED_CHAPTERS:
+            self._build_numbered_subsections(
+                report_parts,
+                prefix,
+                heading,
+                subsections,
+                images_by_group,
+                paragraph_context,
+                allow_incomplete=allow_incomplete,
+            )
+
+        report_parts.append(
+            _REPORT_HTML_TAIL_TEMPLATE.format_map(
+                {
+                    "prepared_by": escape(form.signature.prepared_by),
+                    "prepared_by_role": escape(form.signature.prepared_by_role),
+                }
+            )
+        )
+
+        return "".join(report_parts)
 
     def _cover_image_markup(self, image_uri: str | None) -> str:
         if image_uri is None:
             return '<p class="figure__missing">No building photo uploaded.</p>'
         return f'<img class="cover__image" src="{image_uri}" alt="Building photo" />'
 
-    def _chapter_heading(self, heading: str) -> str:
-        return f'<h2 class="chapter-heading chapter-heading--standalone">{escape(heading)}</h2>'
-
-    def _chapter_section(self, heading: str, body_markup: str) -> str:
-        return f"""
-<section class="section">
-  <h2 class="chapter-heading">{escape(heading)}</h2>
-  {body_markup}
-</section>
-"""
-
-    def _subsection(self, heading: str, body_markup: str) -> str:
-        return f"""
-<section class="section">
-  <h3 class="subsection-heading">{escape(heading)}</h3>
-  {body_markup}
-</section>
-"""
-
     def _build_numbered_subsections(
         self,
+        out: list[str],
         prefix: str,
-        defs: list[tuple[str, str, list[PhotoGroupName]]],
-        session: ReportSession,
+        chapter_heading: str,
+        defs: tuple[_SubsectionDef, ...],
+        images_by_group: dict[PhotoGroupName, _GroupPhotos],
+        paragraph_context: dict[str, str],
         *,
         allow_incomplete: bool = False,
-    ) -> list[str]:
-        """Build subsection HTML blocks with dynamic numbering.
+    ) -> None:
+        """Append a chapter heading and its subsections with dynamic numbering.
 
         When *allow_incomplete* is True, subsections whose photo groups are all
         empty are omitted entirely and the remaining subsections are
-        renumbered sequentially.
+        renumbered sequentially. The chapter heading is only written when at
+        least one subsection remains.
         """
-        result: list[str] = []
         counter = 0
-        for title_suffix, body_template, photo_groups in defs:
-            if allow_incomplete and not self._subsection_has_photos(session, photo_groups):
+        for title_suffix, blocks in defs:
+            if allow_incomplete and not self._subsection_has_photos(images_by_group, blocks):
                 continue
             counter += 1
+            if counter == 1:
+                _chapter_heading(out, chapter_heading)
+
             label = f"{prefix}.{counter}"
-            heading = f"{label}. {title_suffix}"
-            body = body_template.replace("{fig}", label)
-            result.append(self._subsection(heading, body))
-        return result
+            _open_section(out, "h3", "subsection-heading", f"{label}. {title_suffix}")
+            for block in blocks:
+                if isinstance(block, str):
+                    _paragraph(out, block.format_map(paragraph_context))
+                else:
+                    _figure(
+                        out,
+                        block.caption.replace("{fig}", label),
+                        images_by_group[block.group_name],
+                        contain_images=block.contain_images,
+                    )
+            out.append(_SECTION_CLOSE)
 
     def _subsection_has_photos(
-        self, session: ReportSession, photo_groups: list[PhotoGroupName]
-    ) -> bool:
-        """Return True if *any* of the given photo groups has at least one image."""
-        return any(bool(self._all_image_info(session, group)) for group in photo_groups)
-
-    def _paragraph(self, markup: str) -> str:
-        return f'<p class="section__paragraph">{markup}</p>'
-
-    def _figure(
         self,
-        caption: str,
-        images: list[_ImageInfo],
-        *,
-        contain_images: bool = False,
-        large: bool = False,
-    ) -> str:
-        if not images:
-            return f"""
-<section class="figure">
-  <p class="figure__missing">No images uploaded for this figure.</p>
-  <p class="figure__caption">{escape(caption)}</p>
-</section>
-"""
-
-        if large:
-            grids_markup = self._build_image_grid(
-                images, caption, contain_images=contain_images, large=True
-            )
-        else:
-            landscape = [img for img in images if img.is_landscape]
-            portrait = [img for img in images if not img.is_landscape]
-            grids_markup = ""
-            if landscape:
-                grids_markup += self._build_image_grid(
-                    landscape, caption, contain_images=contain_images
-                )
-            if portrait:
-                grids_markup += self._build_image_grid(
-                    portrait, caption, contain_images=contain_images
-                )
-
-        return f"""
-<section class="figure">
-  {grids_markup}
-  <p class="figure__caption">{escape(caption)}</p>
-</section>
-"""
-
-    def _build_image_grid(
-        self,
-        images: list[_ImageInfo],
-        caption: str,
-        *,
-        contain_images: bool = False,
-        large: bool = False,
-    ) -> str:
-        grid_classes = ["figure__grid"]
-        base_classes = ["figure__img"]
-
-        all_portrait = all(not img.is_landscape for img in images)
-
-        if large:
-            base_classes.append("figure__img--large")
-            grid_classes.append("figure__grid--single")
-        elif len(images) == 1:
-            grid_classes.append("figure__grid--single")
-        elif len(images) == 2 or len(images) == 4:
-            if all_portrait:
-                grid_classes.append("figure__grid--portrait-pair")
-        else:
-            grid_classes.append("figure__grid--three")
-
-        if contain_images:
-            base_classes.append("figure__img--contain")
-
-        base_class_markup = " ".join(base_classes)
-        grid_class_markup = " ".join(grid_classes)
-        items: list[str] = []
-        for img in images:
-            orientation = "figure__img--landscape" if img.is_landscape else "figure__img--portrait"
-            cls = f"{base_class_markup} {orientation}"
-            items.append(
-                '<div class="figure__item">'
-                f'<img class="{cls}" src="{img.uri}" alt="{escape(caption)}" />'
-                "</div>"
-            )
-        return f'<div class="{grid_class_markup}">{"".join(items)}</div>'
+        images_by_group: dict[PhotoGroupName, _GroupPhotos],
+        blocks: tuple[str | _FigureDef, ...],
+    ) -> bool:
+        """Return True if *any* of the figures' photo groups has at least one image."""
+        return any(
+            images_by_group[block.group_name].uris
+            for block in blocks
+            if isinstance(block, _FigureDef)
+        )
 
     def _has_annex_documents(self, session: ReportSession) -> bool:
         return any(
@@ -903,58 +1138,65 @@ class WeasyPrintActivityReportPdfRenderer:
         )
 
     def _merge_report_with_annex_documents(
-        self, session: ReportSession, report_pdf_bytes: bytes
-    ) -> bytes:
+        self,
+        session: ReportSession,
+        report_pdf_bytes: bytes,
+        target: BinaryIO,
+        image_cache: dict[str, object],
+        resources: _RenderResources,
+    ) -> None:
         if session.form_fields is None:
             raise RendererNotReadyError("Report session has no form fields to render.")
 
         writer = PdfWriter()
         self._append_pdf_bytes(writer, report_pdf_bytes)
 
-        logo_uri = self._company_logo_uri()
-        building_name = session.form_fields.building_details.building_name
+        logo_uri = _company_logo_uri()
+        escaped_building_name = escape(session.form_fields.building_details.building_name)
 
+        annexes_directory = os.path.join(self._sessions_root, str(session.id), "annexes")
         for annex in _ANNEX_SECTIONS:
             annex_document = session.annex_documents.get(annex.group_name.value)
             if annex_document is None:
                 continue
 
-            annex_path = (
-                self._sessions_root
-                / str(session.id)
-                / "annexes"
-                / annex.group_name.value
-                / annex_document.stored_filename
+            annex_path = os.path.join(
+                annexes_directory, annex.group_name.value, annex_document.stored_filename
             )
-            if not annex_path.exists():
+            if not os.path.isfile(annex_path):
                 continue
 
             annex_cover_html = self._build_annex_cover_html(
-                building_name=building_name,
+                escaped_building_name=escaped_building_name,
                 annex_numeral=annex.numeral,
                 annex_title=annex.title,
                 logo_uri=logo_uri,
             )
             annex_cover_pdf_bytes = HTML(
                 string=annex_cover_html,
-                base_url=self._sessions_root.resolve().as_uri(),
-            ).write_pdf()
+                base_url=self._sessions_root_uri,
+                url_fetcher=_URL_FETCHER,
+            ).write_pdf(
+                stylesheets=[resources.annex_cover_stylesheet],
+                font_config=resources.font_config,
+                cache=image_cache,
+                optimize_images=self._optimize_images,
+                jpeg_quality=self._jpeg_quality,
+            )
             if annex_cover_pdf_bytes is None:
                 raise RendererNotReadyError("Annex cover renderer returned no PDF bytes.")
 
             self._append_pdf_bytes(writer, annex_cover_pdf_bytes)
             self._append_pdf_path(writer, annex_path)
 
-        output = BytesIO()
-        writer.write(output)
-        return output.getvalue()
+        writer.write(target)
 
     def _append_pdf_bytes(self, writer: PdfWriter, pdf_bytes: bytes) -> None:
         reader = PdfReader(BytesIO(pdf_bytes))
         for page in reader.pages:
             writer.add_page(page)
 
-    def _append_pdf_path(self, writer: PdfWriter, pdf_path: Path) -> None:
+    def _append_pdf_path(self, writer: PdfWriter, pdf_path: str) -> None:
         reader = PdfReader(pdf_path)
         for page in reader.pages:
             writer.add_page(page)
@@ -962,7 +1204,7 @@ class WeasyPrintActivityReportPdfRenderer:
     def _build_annex_cover_html(
         self,
         *,
-        building_name: str,
+        escaped_building_name: str,
         annex_numeral: str,
         annex_title: str,
         logo_uri: str | None,
@@ -973,182 +1215,212 @@ class WeasyPrintActivityReportPdfRenderer:
             else f'<img class="report-header__logo" src="{logo_uri}" alt="Company logo" />'
         )
 
-        return f"""
-<!doctype html>
-<html lang="en">
-  <head>
-    <meta charset="utf-8" />
-    <style>
-      @page {{
-        size: A4;
-        margin: 40mm 16mm 20mm;
-        @top-center {{
-          content: element(report-header);
-          width: 100%;
-        }}
-      }}
-
-      * {{
-        box-sizing: border-box;
-      }}
-
-      body {{
-        margin: 0;
-        color: #1b1b1b;
-        font: 12px/1.6 "Times New Roman", Times, serif;
-        background: #ffffff;
-      }}
-
-      .annex-cover {{
-        min-height: 237mm;
-        display: flex;
-        flex-direction: column;
-      }}
-
-      .report-header {{
-        position: running(report-header);
-        border-bottom: 1px solid #1f1f1f;
-        padding-bottom: 2.5mm;
-        font: 11px/1.2 "Times New Roman", Times, serif;
-      }}
-
-      .report-header__logo-wrap {{
-        margin-bottom: 1.2mm;
-      }}
-
-      .report-header__row + .report-header__row {{
-        margin-top: 0.4mm;
-      }}
-
-      .report-header__row {{
-        display: grid;
-        grid-template-columns: minmax(0, 1fr) auto;
-        column-gap: 5mm;
-        align-items: baseline;
-      }}
-
-      .report-header__logo {{
-        width: 30mm;
-        height: auto;
-      }}
-
-      .report-header__logo-fallback {{
-        margin: 0;
-        font-weight: 700;
-      }}
-
-      .report-header__line {{
-        margin: 0;
-        font-size: 11px;
-      }}
-
-      .report-header__line--title,
-      .report-header__line--report {{
-        font-weight: 700;
-      }}
-
-      .report-header__line--building {{
-        white-space: normal;
-      }}
-
-      .annex-cover__body {{
-        flex: 1 1 auto;
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-        align-items: center;
-        text-align: center;
-        gap: 4mm;
-      }}
-
-      .annex-cover__title {{
-        margin: 0;
-        font: 700 36pt/1.1 "Times New Roman", Times, serif;
-        text-transform: uppercase;
-        letter-spacing: 0.08em;
-      }}
-
-      .annex-cover__subtitle {{
-        margin: 0;
-        font: 700 13pt/1.3 "Times New Roman", Times, serif;
-      }}
-    </style>
-  </head>
-  <body>
-    <section class="annex-cover">
-      <header class="report-header">
-        <div class="report-header__logo-wrap">{header_logo_markup}</div>
-        <div class="report-header__meta">
-          <div class="report-header__row">
-            <p class="report-header__line report-header__line--title">Material Testing Works</p>
-            <p class="report-header__line report-header__line--report">Annex</p>
-          </div>
-          <div class="report-header__row">
-            <p class="report-header__line report-header__line--building">{escape(building_name)}</p>
-            <p class="report-header__line">&nbsp;</p>
-          </div>
-        </div>
-      </header>
-
-      <main class="annex-cover__body">
-        <h1 class="annex-cover__title">ANNEX {escape(annex_numeral)}</h1>
-        <p class="annex-cover__subtitle">{escape(annex_title)}</p>
-      </main>
-    </section>
-  </body>
-</html>
-"""
+        return _ANNEX_COVER_HTML_TEMPLATE.format_map(
+            {
+                "header_logo": header_logo_markup,
+                "building_name": escaped_building_name,
+                # Numerals and titles come from _ANNEX_SECTIONS, which holds HTML-safe literals
+                "annex_numeral": annex_numeral,
+                "annex_title": annex_title,
+            }
+        )
 
-    def _company_logo_uri(self) -> str | None:
-        logo_path = Path(__file__).resolve().parents[2] / "frontend" / "public" / "asset-80.svg"
-        if not logo_path.exists():
-            return None
-        return logo_path.resolve().as_uri()
+    def _collect_image_info(self, session: ReportSession) -> dict[PhotoGroupName, _GroupPhotos]:
+        """Resolve every photo group once so each figure reuses the same lookups."""
+        images_by_group = dict.fromkeys(PhotoGroupName, _NO_PHOTOS)
+        # The session's image directory and URI prefix are built once, and only groups
+        # that have uploads are listed
+        images_directory = os.path.join(self._sessions_root, str(session.id), "images")
+        images_uri = f"{self._sessions_root_uri}/{session.id}/images/"
+        for group_value, image_metadata in session.images.items():
+            group_name = _PHOTO_GROUPS_BY_VALUE.get(group_value)
+            if group_name is not None and image_metadata:
+                images_by_group[group_name] = self._all_image_info(
+                    image_metadata,
+                    os.path.join(images_directory, group_value),
+                    f"{images_uri}{quote(group_value)}/",
+                )
 
-    def _first_image_uri(self, session: ReportSession, group_name: PhotoGroupName) -> str | None:
-        infos = self._all_image_info(session, group_name)
-        if infos:
-            return infos[0].uri
-        return None
+        return images_by_group
 
     def _all_image_info(
-        self, session: ReportSession, group_name: PhotoGroupName
-    ) -> list[_ImageInfo]:
-        image_metadata = session.images.get(group_name.value, [])
-        result: list[_ImageInfo] = []
-
+        self, image_metadata: list[ImageMeta], group_directory: str, group_uri: str
+    ) -> _GroupPhotos:
+        # One directory listing per group instead of a stat per image
+        try:
+            with os.scandir(group_directory) as entries:
+                stored_filenames = {entry.name for entry in entries}
+        except FileNotFoundError:
+            return _NO_PHOTOS
+
+        # Orientation is bucketed here so figures never re-filter the same list
+        uris: list[str] = []
+        is_landscape: list[bool] = []
+        landscape: list[str] = []
+        portrait: list[str] = []
         for image in image_metadata:
-            image_path = (
-                self._sessions_root
-                / str(session.id)
-                / "images"
-                / group_name.value
-                / image.stored_filename
+            if image.stored_filename not in stored_filenames:
+                continue
+
+            uri = group_uri + quote(image.stored_filename)
+            uris.append(uri)
+            is_landscape.append(image.is_landscape)
+            (landscape if image.is_landscape else portrait).append(uri)
+
+        return _GroupPhotos(
+            uris=tuple(uris),
+            is_landscape=tuple(is_landscape),
+            landscape=tuple(landscape),
+            portrait=tuple(portrait),
+        )
+
+
+# Headings and captions arrive as markup: the module's own titles are HTML-safe literals,
+# and the one user-supplied caption (the building name) is escaped by the caller
+def _chapter_heading(out: list[str], heading_markup: str) -> None:
+    out.append(f'<h2 class="chapter-heading chapter-heading--standalone">{heading_markup}</h2>')
+
+
+def _open_section(out: list[str], tag: str, heading_class: str, heading_markup: str) -> None:
+    out.append(
+        '\n<section class="section">\n'
+        f'  <{tag} class="{heading_class}">{heading_markup}</{tag}>\n  '
+    )
+
+
+def _paragraph(out: list[str], markup: str) -> None:
+    out.append(f'<p class="section__paragraph">{markup}</p>')
+
+
+def _figure(
+    out: list[str],
+    caption_markup: str,
+    photos: _GroupPhotos,
+    *,
+    contain_images: bool = False,
+    large: bool = False,
+) -> None:
+    if not photos.uris:
+        out.append(f"""
+<section class="figure">
+  <p class="figure__missing">No images uploaded for this figure.</p>
+  <p class="figure__caption">{caption_markup}</p>
+</section>
+""")
+        return
+
+    out.append('\n<section class="figure">\n  ')
+    if large:
+        _build_image_grid(
+            out,
+            photos.uris,
+            photos.is_landscape,
+            caption_markup,
+            all_portrait=not photos.landscape,
+            contain_images=contain_images,
+            large=True,
+        )
+    else:
+        if photos.landscape:
+            _build_image_grid(
+                out,
+                photos.landscape,
+                (True,) * len(photos.landscape),
+                caption_markup,
+                all_portrait=False,
+                contain_images=contain_images,
+            )
+        if photos.portrait:
+            _build_image_grid(
+                out,
+                photos.portrait,
+                (False,) * len(photos.portrait),
+                caption_markup,
+                all_portrait=True,
+                contain_images=contain_images,
             )
-            if image_path.exists():
-                result.append(
-                    _ImageInfo(
-                        uri=image_path.resolve().as_uri(),
-                        is_landscape=image.width >= image.height,
-                    )
-                )
 
-        return result
+    out.append(f'\n  <p class="figure__caption">{caption_markup}</p>\n</section>\n')
+
+
+def _build_image_grid(
+    out: list[str],
+    uris: tuple[str, ...],
+    is_landscape: tuple[bool, ...],
+    caption_markup: str,
+    *,
+    all_portrait: bool,
+    contain_images: bool = False,
+    large: bool = False,
+) -> None:
+    # The orientation buckets already know whether every image is portrait, so the grid
+    # and image classes are table lookups rather than a scan of the images
+    grid_class_markup = (
+        _GRID_CLASS_MARKUP_LARGE
+        if large
+        else _GRID_CLASS_MARKUP.get((len(uris), all_portrait), _GRID_CLASS_MARKUP_DEFAULT)
+    )
+    landscape_cls, portrait_cls = _IMAGE_CLASS_MARKUP[large, contain_images]
+    out.append(f'<div class="{grid_class_markup}">')
+    for uri, landscape in zip(uris, is_landscape, strict=True):
+        cls = landscape_cls if landscape else portrait_cls
+        out.append(
+            '<div class="figure__item">'
+            f'<img class="{cls}" src="{uri}" alt="{caption_markup}" />'
+            "</div>"
+        )
+    out.append("</div>")
+
+
+def warm_up_weasyprint() -> None:
+    """Lay out a blank page so a fresh render process starts with fonts and caches loaded."""
+    _company_logo_uri()
+    resources = _render_resources()
+    HTML(string="<p>&nbsp;</p>").write_pdf(
+        stylesheets=[resources.report_stylesheet], font_config=resources.font_config
+    )
+
+
+def _render_resources() -> _RenderResources:
+    resources: _RenderResources | None = getattr(_THREAD_RENDER_RESOURCES, "resources", None)
+    if resources is None:
+        font_config = FontConfiguration()
+        resources = _RenderResources(
+            font_config=font_config,
+            report_stylesheet=CSS(string=_REPORT_CSS, font_config=font_config),
+            annex_cover_stylesheet=CSS(string=_ANNEX_COVER_CSS, font_config=font_config),
+        )
+        _THREAD_RENDER_RESOURCES.resources = resources
 
+    return resources
 
-def _format_testing_month(testing_date: str) -> str:
-    parts = testing_date.split("-")
-    if len(parts) != 2:
-        return testing_date
 
-    year, month = parts
+@cache
+def _company_logo_uri() -> str | None:
+    # Inlined once per process so WeasyPrint never has to fetch the file during a render
+    try:
+        logo_bytes = _COMPANY_LOGO_PATH.read_bytes()
+    except FileNotFoundError:
+        return None
+    return f"data:image/svg+xml;base64,{b64encode(logo_bytes).decode('ascii')}"
+
+
+def _format_testing_month(testing_date: str) -> str:
+    year, separator, month = testing_date.partition("-")
     try:
         month_number = int(month)
-        if month_number < 1 or month_number > 12:
-            return testing_date
-        return f"{month_name[month_number].upper()} {year}"
     except ValueError:
-        return testing_date
+        month_number = 0
+
+    if not separator or not 1 <= month_number <= 12:
+        # Unparsed dates are still user input, so they are escaped like every other field
+        return escape(testing_date)
+
+    return f"{_MONTH_NAMES_UPPER[month_number]} {escape(year)}"
+
+
+# calendar.month_name formats the name through strftime on every lookup
+_MONTH_NAMES_UPPER = tuple(name.upper() for name in month_name)
 
 
 _UNITS = [
@@ -1185,6 +1457,15 @@ _TENS = [
     "eighty",
     "ninety",
 ]
+# Every value under a hundred is spelled out once at import; larger values are assembled from it
+_BELOW_HUNDRED = tuple(
+    _UNITS[value]
+    if value < 20
+    else _TENS[value // 10]
+    if value % 10 == 0
+    else f"{_TENS[value // 10]}-{_UNITS[value % 10]}"
+    for value in range(100)
+)
 
 
 def _words_with_digits(value: int) -> str:
@@ -1192,28 +1473,27 @@ def _words_with_digits(value: int) -> str:
 
 
 def _number_to_words(value: int) -> str:
-    if value < 20:
-        return _UNITS[value]
-
     if value < 100:
-        tens = _TENS[value // 10]
-        remainder = value % 10
-        if remainder == 0:
-            return tens
-        return f"{tens}-{_UNITS[remainder]}"
-
-    if value < 1000:
-        hundreds = f"{_UNITS[value // 100]} hundred"
-        remainder = value % 100
-        if remainder == 0:
-            return hundreds
-        return f"{hundreds} {_number_to_words(remainder)}"
-
-    if value < 1_000_000:
-        thousands = f"{_number_to_words(value // 1000)} thousand"
-        remainder = value % 1000
-        if remainder == 0:
-            return thousands
-        return f"{thousands} {_number_to_words(remainder)}"
-
-    return str(value)
+        return _BELOW_HUNDRED[value]
+
+    if value >= 1_000_000:
+        return str(value)
+
+    words: list[str] = []
+    thousands, remainder = divmod(value, 1000)
+    if thousands:
+        _append_below_thousand(words, thousands)
+        words.append("thousand")
+    if remainder:
+        _append_below_thousand(words, remainder)
+
+    return " ".join(words)
+
+
+def _append_below_thousand(words: list[str], value: int) -> None:
+    hundreds, remainder = divmod(value, 100)
+    if hundreds:
+        words.append(_UNITS[hundreds])
+        words.append("hundred")
+    if remainder:
+        words.append(_BELOW_HUNDRED[remainder])
@@ -13,8 +13,11 @@ from .models import (
 )
 from .report_repository import (
     FileSystemReportRepository,
+    PhotoGroupFullError,
     ReportRepository,
+    ReportStatusConflictError,
     SessionNotFoundError,
+    SessionUploadLimitError,
 )
 
 __all__ = [
@@ -24,10 +27,13 @@ __all__ = [
     "FileSystemReportRepository",
     "ImageMeta",
     "PHOTO_GROUP_LIMITS",
+    "PhotoGroupFullError",
     "PhotoGroupName",
     "ReportFormFields",
     "ReportRepository",
     "ReportSession",
     "ReportStatus",
+    "ReportStatusConflictError",
     "SessionNotFoundError",
+    "SessionUploadLimitError",
 ]
@@ -1,8 +1,13 @@
 from datetime import datetime, timezone
 from enum import StrEnum
+from itertools import chain
+from operator import attrgetter
+from typing import Self
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+_size_bytes = attrgetter("size_bytes")
 
 
 class ReportStatus(StrEnum):
@@ -135,6 +140,15 @@ class ImageMeta(BaseModel):
     size_bytes: int = Field(ge=0)
     width: int = Field(gt=0)
     height: int = Field(gt=0)
+    is_landscape: bool = False
+
+    @model_validator(mode="after")
+    def _backfill_is_landscape(self) -> Self:
+        # Images stored before orientation was recorded derive it once on load.
+        if "is_landscape" not in self.model_fields_set:
+            self.is_landscape = self.width >= self.height
+
+        return self
 
 
 class AnnexDocumentMeta(BaseModel):
@@ -150,6 +164,19 @@ class ReportSession(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     status: ReportStatus = ReportStatus.DRAFT
     form_fields: ReportFormFields | None = None
+    # Keyed by group value, the shape the API and frontend address figures by; only groups
+    # with uploads have a key, so the renderer walks populated groups alone
     images: dict[str, list[ImageMeta]] = Field(default_factory=dict)
     annex_documents: dict[str, AnnexDocumentMeta] = Field(default_factory=dict)
     generated_pdf_path: str | None = None
+    total_upload_bytes: int = Field(default=0, ge=0)
+
+    @model_validator(mode="after")
+    def _backfill_total_upload_bytes(self) -> Self:
+        # Sessions stored before the running total existed compute it once on load.
+        if "total_upload_bytes" not in self.model_fields_set:
+            self.total_upload_bytes = sum(
+                map(_size_bytes, chain.from_iterable(self.images.values()))
+            ) + sum(map(_size_bytes, self.annex_documents.values()))
+
+        return self
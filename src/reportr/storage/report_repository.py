@@ -1,12 +1,23 @@
+import os
 import re
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import suppress
 from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from io import BufferedWriter, BytesIO
 from pathlib import Path
-from shutil import copyfileobj, rmtree
+from shutil import rmtree
+from threading import Lock
+from types import TracebackType
 from typing import BinaryIO
 from uuid import UUID, uuid4
+from weakref import WeakValueDictionary
+
+from pydantic import BaseModel, TypeAdapter
 
 from .models import (
+    PHOTO_GROUP_LIMITS,
     AnnexDocumentMeta,
     AnnexGroupName,
     ImageMeta,
@@ -16,6 +27,42 @@ from .models import (
     ReportStatus,
 )
 
+# Parsed session.json entries kept in memory per repository
+SESSION_CACHE_SIZE = 256
+
+# dump_json yields UTF-8 bytes directly, unlike model_dump_json which builds a str first
+SESSION_ADAPTER = TypeAdapter(ReportSession)
+
+# Read size for copying uploads; a downscaled photo fits in one read, an annex PDF in a few
+UPLOAD_COPY_CHUNK_SIZE = 1 << 20
+
+
+class _SessionExpiryFields(BaseModel):
+    # The expiry sweep's view of session.json; pydantic-core skips every other field unbuilt
+    id: UUID
+    created_at: datetime
+    status: ReportStatus
+
+
+class _SessionLock:
+    # threading.Lock cannot be weakly referenced; this wrapper lets the repository drop a
+    # session's lock as soon as no thread holds or waits on it
+    __slots__ = ("_lock", "__weakref__")
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._lock.release()
+
 
 class SessionNotFoundError(LookupError):
     def __init__(self, session_id: UUID) -> None:
@@ -23,6 +70,30 @@ class SessionNotFoundError(LookupError):
         self.session_id = session_id
 
 
+class PhotoGroupFullError(Exception):
+    def __init__(self, group_name: PhotoGroupName, max_images: int) -> None:
+        super().__init__(
+            f"Photo group '{group_name.value}' already reached its max of {max_images}."
+        )
+        self.group_name = group_name
+        self.max_images = max_images
+
+
+class SessionUploadLimitError(Exception):
+    def __init__(self, session_id: UUID, max_total_upload_bytes: int) -> None:
+        max_megabytes = max_total_upload_bytes // (1024 * 1024)
+        super().__init__(f"Session exceeds the {max_megabytes}MB total upload limit.")
+        self.session_id = session_id
+        self.max_total_upload_bytes = max_total_upload_bytes
+
+
+class ReportStatusConflictError(Exception):
+    def __init__(self, session_id: UUID, status: ReportStatus) -> None:
+        super().__init__(f"Report session '{session_id}' is {status.value}")
+        self.session_id = session_id
+        self.status = status
+
+
 class ReportRepository(ABC):
     @abstractmethod
     def create_session(self) -> ReportSession:
@@ -47,8 +118,9 @@ class ReportRepository(ABC):
         size_bytes: int,
         width: int,
         height: int,
+        max_total_upload_bytes: int | None = None,
     ) -> ImageMeta:
-        """Persist an uploaded image and register image metadata on a session."""
+        """Persist an uploaded image within the group and session limits and register it."""
 
     @abstractmethod
     def save_annex_document(
@@ -59,21 +131,32 @@ class ReportRepository(ABC):
         source: BinaryIO,
         original_filename: str,
         size_bytes: int,
+        max_total_upload_bytes: int | None = None,
     ) -> AnnexDocumentMeta:
-        """Persist an uploaded annex PDF and register metadata on a session."""
+        """Persist an uploaded annex PDF within the session limit and register it."""
 
     @abstractmethod
     def persist_generated_pdf(self, session_id: UUID, pdf_bytes: bytes) -> Path:
         """Persist generated report output to long-term storage."""
 
     @abstractmethod
-    def set_status(self, session_id: UUID, status: ReportStatus) -> ReportSession:
-        """Update report session status."""
+    def set_status(
+        self,
+        session_id: UUID,
+        status: ReportStatus,
+        *,
+        expected_status: ReportStatus | None = None,
+    ) -> ReportSession:
+        """Update report session status, only from expected_status when it is given."""
 
     @abstractmethod
     def get_generated_pdf_path(self, session_id: UUID) -> Path | None:
         """Return generated PDF path when available for download."""
 
+    @abstractmethod
+    def ensure_completed_if_pdf_exists(self, session_id: UUID) -> Path | None:
+        """Mark the session completed if its generated PDF exists and return the PDF path."""
+
     @abstractmethod
     def cleanup_session_images(self, session_id: UUID) -> None:
         """Remove session image files after successful generation."""
@@ -96,6 +179,19 @@ class FileSystemReportRepository(ReportRepository):
     ) -> None:
         self._sessions_root = sessions_root
         self._reports_root = reports_root
+        # Metadata paths are joined as strings; every request stats or reads session.json
+        self._sessions_root_str = os.fspath(sessions_root)
+        # session_id -> ((st_ino, st_mtime_ns, st_size) of session.json, parsed session).
+        # Readers get shallow copies: top-level fields are theirs, nested models are shared with
+        # the cache and read-only. Mutators re-parse in _require_session, which is several
+        # times cheaper than a deep copy of a session with its photos
+        self._session_cache: dict[UUID, tuple[tuple[int, int, int], ReportSession]] = {}
+        self._session_cache_lock = Lock()
+        # The upload form sends every photo at once; without these, concurrent read-modify-write
+        # cycles on session.json would drop each other's image metadata. One lock per session,
+        # so a slow upload never holds up another session's writes
+        self._session_locks: WeakValueDictionary[UUID, _SessionLock] = WeakValueDictionary()
+        self._session_locks_lock = Lock()
 
         self._sessions_root.mkdir(parents=True, exist_ok=True)
         self._reports_root.mkdir(parents=True, exist_ok=True)
@@ -111,23 +207,45 @@ class FileSystemReportRepository(ReportRepository):
     def create_session(self) -> ReportSession:
         session = ReportSession(id=uuid4())
         self._session_directory(session.id).mkdir(parents=True, exist_ok=False)
-        self._images_directory(session.id).mkdir(parents=True, exist_ok=True)
-        self._annexes_directory(session.id).mkdir(parents=True, exist_ok=True)
+        # Every upload group directory is made here so uploads can open their file directly
+        images_directory = self._images_directory(session.id)
+        images_directory.mkdir()
+        for photo_group in PhotoGroupName:
+            (images_directory / photo_group.value).mkdir()
+        annexes_directory = self._annexes_directory(session.id)
+        annexes_directory.mkdir()
+        for annex_group in AnnexGroupName:
+            (annexes_directory / annex_group.value).mkdir()
         self._write_session(session)
         return session
 
     def get_session(self, session_id: UUID) -> ReportSession | None:
         metadata_path = self._metadata_path(session_id)
-        if not metadata_path.exists():
+        try:
+            metadata_stat = os.stat(metadata_path)
+        except FileNotFoundError:
             return None
 
-        return ReportSession.model_validate_json(metadata_path.read_text(encoding="utf-8"))
+        # Every write replaces session.json with a new file, so an unchanged stat means
+        # the cached parse is current and only the JSON decode is skipped
+        cache_key = self._session_cache_key(metadata_stat)
+        with self._session_cache_lock:
+            cached = self._session_cache.pop(session_id, None)
+            if cached is not None and cached[0] == cache_key:
+                # Re-inserted so eviction drops the least recently used session first
+                self._session_cache[session_id] = cached
+                return cached[1].model_copy()
+
+        session = ReportSession.model_validate_json(self._read_metadata_bytes(metadata_path))
+        self._cache_session(session_id, cache_key, session)
+        return session.model_copy()
 
     def save_form_fields(self, session_id: UUID, form_fields: ReportFormFields) -> ReportSession:
-        session = self._require_session(session_id)
-        session.form_fields = form_fields
-        self._write_session(session)
-        return session
+        with self._session_lock(session_id):
+            session = self._require_session(session_id)
+            session.form_fields = form_fields
+            self._write_session(session)
+            return session
 
     def save_image(
         self,
@@ -139,32 +257,53 @@ class FileSystemReportRepository(ReportRepository):
         size_bytes: int,
         width: int,
         height: int,
+        max_total_upload_bytes: int | None = None,
     ) -> ImageMeta:
-        session = self._require_session(session_id)
-
-        image_id = uuid4()
-        extension = self._resolve_extension(original_filename)
-        stored_filename = f"{image_id}{extension}"
-        image_directory = self._images_directory(session_id) / group_name.value
-        image_directory.mkdir(parents=True, exist_ok=True)
-        image_path = image_directory / stored_filename
-
-        with image_path.open("wb") as destination:
-            copyfileobj(source, destination)
-
-        image = ImageMeta(
-            id=image_id,
-            group_name=group_name,
-            original_filename=original_filename,
-            stored_filename=stored_filename,
-            size_bytes=size_bytes,
-            width=width,
-            height=height,
-        )
-        session.images.setdefault(group_name.value, []).append(image)
-        self._write_session(session)
-
-        return image
+        with self._session_lock(session_id):
+            session = self._require_session(session_id)
+
+            # Checked under the lock: the API's own checks read the session before awaiting the
+            # upload, so concurrent uploads could all pass them
+            group_key = group_name.value
+            max_images = PHOTO_GROUP_LIMITS[group_name][1]
+            if len(session.images.get(group_key, ())) >= max_images:
+                raise PhotoGroupFullError(group_name, max_images)
+
+            self._check_upload_limit(session, size_bytes, max_total_upload_bytes)
+
+            image_id = uuid4()
+            extension = self._resolve_extension(original_filename)
+            image_directory = self._images_directory(session_id) / group_key
+
+            # Files are named by content, so a photo uploaded twice to one figure shares a file
+            # (and a URI) that the renderer fetches, decodes and embeds only once
+            temporary_path = image_directory / f"{image_id}.tmp"
+            content_hash = sha256()
+            with self._open_upload_destination(temporary_path) as destination:
+                for chunk in self._upload_chunks(source):
+                    content_hash.update(chunk)
+                    destination.write(chunk)
+
+            stored_filename = f"{content_hash.hexdigest()}{extension}"
+            temporary_path.replace(image_directory / stored_filename)
+
+            image = ImageMeta(
+                id=image_id,
+                group_name=group_name,
+                original_filename=original_filename,
+                stored_filename=stored_filename,
+                size_bytes=size_bytes,
+                width=width,
+                height=height,
+                is_landscape=width >= height,
+            )
+            session.images.setdefault(group_key, []).append(image)
+            session.total_upload_bytes += size_bytes
+            # Rewritten whole rather than journaled: the photo group limits cap a session at a
+            # few dozen images, and one file keeps the atomic replace and stat-keyed cache exact
+            self._write_session(session)
+
+            return image
 
     def save_annex_document(
         self,
@@ -174,128 +313,234 @@ class FileSystemReportRepository(ReportRepository):
         source: BinaryIO,
         original_filename: str,
         size_bytes: int,
+        max_total_upload_bytes: int | None = None,
     ) -> AnnexDocumentMeta:
-        session = self._require_session(session_id)
-
-        annex_id = uuid4()
-        extension = Path(original_filename).suffix.lower()
-        if extension != ".pdf":
-            extension = ".pdf"
-
-        stored_filename = f"{annex_id}{extension}"
-        annex_directory = self._annexes_directory(session_id) / group_name.value
-        annex_directory.mkdir(parents=True, exist_ok=True)
-
-        for existing_file in annex_directory.iterdir():
-            if existing_file.is_file():
-                existing_file.unlink()
-
-        annex_path = annex_directory / stored_filename
-        with annex_path.open("wb") as destination:
-            copyfileobj(source, destination)
-
-        annex_document = AnnexDocumentMeta(
-            id=annex_id,
-            group_name=group_name,
-            original_filename=original_filename,
-            stored_filename=stored_filename,
-            size_bytes=size_bytes,
-        )
-        session.annex_documents[group_name.value] = annex_document
-        self._write_session(session)
-
-        return annex_document
+        with self._session_lock(session_id):
+            session = self._require_session(session_id)
+
+            group_key = group_name.value
+            replaced_document = session.annex_documents.get(group_key)
+            replaced_size = replaced_document.size_bytes if replaced_document is not None else 0
+            self._check_upload_limit(session, size_bytes - replaced_size, max_total_upload_bytes)
+
+            annex_id = uuid4()
+            extension = Path(original_filename).suffix.lower()
+            if extension != ".pdf":
+                extension = ".pdf"
+
+            stored_filename = f"{annex_id}{extension}"
+            annex_directory = self._annexes_directory(session_id) / group_key
+
+            with suppress(FileNotFoundError):
+                for existing_file in annex_directory.iterdir():
+                    if existing_file.is_file():
+                        existing_file.unlink()
+
+            annex_path = annex_directory / stored_filename
+            with self._open_upload_destination(annex_path) as destination:
+                for chunk in self._upload_chunks(source):
+                    destination.write(chunk)
+
+            annex_document = AnnexDocumentMeta(
+                id=annex_id,
+                group_name=group_name,
+                original_filename=original_filename,
+                stored_filename=stored_filename,
+                size_bytes=size_bytes,
+            )
+            session.annex_documents[group_key] = annex_document
+            session.total_upload_bytes += size_bytes - replaced_size
+            self._write_session(session)
+
+            return annex_document
 
     def persist_generated_pdf(self, session_id: UUID, pdf_bytes: bytes) -> Path:
-        session = self._require_session(session_id)
+        with self._session_lock(session_id):
+            session = self._require_session(session_id)
+
+            report_directory = self._reports_root / str(session_id)
+            report_directory.mkdir(parents=True, exist_ok=True)
+            report_path = report_directory / self._build_report_filename(session)
+            # Written straight from the render buffer with os.write, skipping the io layer
+            file_descriptor = os.open(report_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                remaining = memoryview(pdf_bytes)
+                while remaining:
+                    remaining = remaining[os.write(file_descriptor, remaining) :]
+            finally:
+                os.close(file_descriptor)
 
-        report_directory = self._reports_root / str(session_id)
-        report_directory.mkdir(parents=True, exist_ok=True)
-        report_path = report_directory / self._build_report_filename(session)
-        report_path.write_bytes(pdf_bytes)
+            session.generated_pdf_path = report_path.as_posix()
+            session.status = ReportStatus.COMPLETED
+            self._write_session(session)
 
-        session.generated_pdf_path = report_path.as_posix()
-        session.status = ReportStatus.COMPLETED
-        self._write_session(session)
+            return report_path
 
-        return report_path
+    def set_status(
+        self,
+        session_id: UUID,
+        status: ReportStatus,
+        *,
+        expected_status: ReportStatus | None = None,
+    ) -> ReportSession:
+        with self._session_lock(session_id):
+            session = self._require_session(session_id)
+            if expected_status is not None and session.status != expected_status:
+                raise ReportStatusConflictError(session_id, session.status)
 
-    def set_status(self, session_id: UUID, status: ReportStatus) -> ReportSession:
-        session = self._require_session(session_id)
-        session.status = status
-        self._write_session(session)
-        return session
+            # Status is one field of session.json, so a no-op flip skips rewriting the whole file
+            if session.status == status:
+                return session
+
+            session.status = status
+            self._write_session(session)
+            return session
 
     def get_generated_pdf_path(self, session_id: UUID) -> Path | None:
-        session = self._require_session(session_id)
-        if session.generated_pdf_path is None:
-            return None
+        session = self.get_session(session_id)
+        if session is None:
+            raise SessionNotFoundError(session_id)
 
-        report_path = Path(session.generated_pdf_path)
-        if not report_path.exists():
-            return None
+        return self._existing_report_path(session)
+
+    def ensure_completed_if_pdf_exists(self, session_id: UUID) -> Path | None:
+        with self._session_lock(session_id):
+            session = self.get_session(session_id)
+            if session is None:
+                raise SessionNotFoundError(session_id)
+
+            report_path = self._existing_report_path(session)
+            if report_path is None:
+                return None
+
+            # get_session returns a copy, so only the status write touches disk
+            if session.status != ReportStatus.COMPLETED:
+                session.status = ReportStatus.COMPLETED
+                self._write_session(session)
 
-        return report_path
+            return report_path
 
     def cleanup_session_images(self, session_id: UUID) -> None:
         self._require_session(session_id)
 
-        image_root = self._images_directory(session_id)
-        if image_root.exists():
-            rmtree(image_root)
+        with suppress(FileNotFoundError):
+            rmtree(self._images_directory(session_id))
 
     def cleanup_session_annex_documents(self, session_id: UUID) -> None:
         self._require_session(session_id)
 
-        annex_root = self._annexes_directory(session_id)
-        if annex_root.exists():
-            rmtree(annex_root)
+        with suppress(FileNotFoundError):
+            rmtree(self._annexes_directory(session_id))
 
     def cleanup_expired_sessions(self, max_age: timedelta) -> int:
         now = datetime.now(timezone.utc)
         cutoff = now - max_age
         removed = 0
 
-        for session_dir in self._sessions_root.iterdir():
-            if not session_dir.is_dir():
-                continue
+        with os.scandir(self._sessions_root) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
 
-            metadata_path = session_dir / "session.json"
-            if not metadata_path.exists():
-                continue
+                # A missing session.json surfaces as an error here instead of costing an extra stat
+                metadata_path = os.path.join(entry.path, "session.json")
+                try:
+                    with open(metadata_path, "rb") as metadata_file:
+                        expiry = _SessionExpiryFields.model_validate_json(metadata_file.read())
+                except Exception:
+                    continue
 
-            try:
-                session = ReportSession.model_validate_json(
-                    metadata_path.read_text(encoding="utf-8")
-                )
-            except Exception:
-                continue
-
-            if session.status == ReportStatus.COMPLETED:
-                continue
+                if expiry.status == ReportStatus.COMPLETED:
+                    continue
 
-            if session.created_at > cutoff:
-                continue
+                if expiry.created_at > cutoff:
+                    continue
 
-            rmtree(session_dir, ignore_errors=True)
-            removed += 1
+                rmtree(entry.path, ignore_errors=True)
+                with self._session_cache_lock:
+                    self._session_cache.pop(expiry.id, None)
+                removed += 1
 
         return removed
 
     def _require_session(self, session_id: UUID) -> ReportSession:
-        session = self.get_session(session_id)
-        if session is None:
-            raise SessionNotFoundError(session_id)
+        # Mutations parse a private copy so a failed write cannot leave edits in the cache
+        try:
+            metadata_bytes = self._read_metadata_bytes(self._metadata_path(session_id))
+        except FileNotFoundError as exc:
+            raise SessionNotFoundError(session_id) from exc
 
-        return session
+        return ReportSession.model_validate_json(metadata_bytes)
+
+    @staticmethod
+    def _check_upload_limit(
+        session: ReportSession, added_bytes: int, max_total_upload_bytes: int | None
+    ) -> None:
+        if max_total_upload_bytes is None:
+            return
+
+        if session.total_upload_bytes + added_bytes > max_total_upload_bytes:
+            raise SessionUploadLimitError(session.id, max_total_upload_bytes)
+
+    @staticmethod
+    def _existing_report_path(session: ReportSession) -> Path | None:
+        if session.generated_pdf_path is None:
+            return None
+
+        # os.path.isfile on the stored str skips building a Path for missing reports
+        if not os.path.isfile(session.generated_pdf_path):
+            return None
+
+        return Path(session.generated_pdf_path)
 
     def _write_session(self, session: ReportSession) -> None:
         metadata_path = self._metadata_path(session.id)
-        metadata_path.parent.mkdir(parents=True, exist_ok=True)
+        # A name per write, so concurrent writers to one session never share a temporary file
+        temporary_path = os.path.join(os.path.dirname(metadata_path), f"session.{uuid4().hex}.tmp")
+        # Compact JSON written with a single os.write; no one reads session.json by hand.
+        # It stays uncompressed: even with every photo group full it is a few pages, and
+        # get_session only re-parses it after a write changes its stat signature.
+        # Status flips go through the same rename: a concurrent generate or upload request
+        # reads the session mid-render and must never see a truncated file
+        try:
+            file_descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileNotFoundError as exc:
+            # create_session made the directory; a sweep removed it since the session was read
+            raise SessionNotFoundError(session.id) from exc
+        try:
+            # os.write may write less than asked; a short write must not be renamed into place
+            remaining = memoryview(SESSION_ADAPTER.dump_json(session))
+            while remaining:
+                remaining = remaining[os.write(file_descriptor, remaining) :]
+            written_stat = os.fstat(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+        os.replace(temporary_path, metadata_path)
+        # The rename keeps the inode, mtime and size, so the next get_session hits this entry
+        # instead of parsing what was just written
+        self._cache_session(session.id, self._session_cache_key(written_stat), session.model_copy())
+
+    def _session_lock(self, session_id: UUID) -> _SessionLock:
+        with self._session_locks_lock:
+            session_lock = self._session_locks.get(session_id)
+            if session_lock is None:
+                session_lock = _SessionLock()
+                self._session_locks[session_id] = session_lock
+
+            return session_lock
+
+    def _cache_session(
+        self, session_id: UUID, cache_key: tuple[int, int, int], session: ReportSession
+    ) -> None:
+        with self._session_cache_lock:
+            self._session_cache.pop(session_id, None)
+            if len(self._session_cache) >= SESSION_CACHE_SIZE:
+                del self._session_cache[next(iter(self._session_cache))]
+            self._session_cache[session_id] = (cache_key, session)
 
-        temporary_path = metadata_path.with_suffix(".tmp")
-        temporary_path.write_text(session.model_dump_json(indent=2), encoding="utf-8")
-        temporary_path.replace(metadata_path)
+    @staticmethod
+    def _session_cache_key(metadata_stat: os.stat_result) -> tuple[int, int, int]:
+        return (metadata_stat.st_ino, metadata_stat.st_mtime_ns, metadata_stat.st_size)
 
     def _session_directory(self, session_id: UUID) -> Path:
         return self._sessions_root / str(session_id)
@@ -306,8 +551,13 @@ class FileSystemReportRepository(ReportRepository):
     def _annexes_directory(self, session_id: UUID) -> Path:
         return self._session_directory(session_id) / "annexes"
 
-    def _metadata_path(self, session_id: UUID) -> Path:
-        return self._session_directory(session_id) / "session.json"
+    def _metadata_path(self, session_id: UUID) -> str:
+        return os.path.join(self._sessions_root_str, str(session_id), "session.json")
+
+    @staticmethod
+    def _read_metadata_bytes(metadata_path: str) -> bytes:
+        with open(metadata_path, "rb") as metadata_file:
+            return metadata_file.read()
 
     @classmethod
     def _build_report_filename(cls, session: ReportSession) -> str:
@@ -325,6 +575,27 @@ class FileSystemReportRepository(ReportRepository):
     def _slugify_filename_part(value: str) -> str:
         return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
 
+    @staticmethod
+    def _open_upload_destination(path: Path) -> BufferedWriter:
+        try:
+            return path.open("wb")
+        except FileNotFoundError:
+            # Sessions stored before group directories were made up front, or whose uploads
+            # were already cleaned up, get the directory on first use
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return path.open("wb")
+
+    @staticmethod
+    def _upload_chunks(source: BinaryIO) -> Iterator[bytes]:
+        # The API hands uploads over as BytesIO; reading one whole from the start returns its
+        # bytes without a copy, so only real streams are read in chunks
+        if isinstance(source, BytesIO):
+            yield source.read()
+            return
+
+        while chunk := source.read(UPLOAD_COPY_CHUNK_SIZE):
+            yield chunk
+
     @staticmethod
     def _resolve_extension(original_filename: str) -> str:
         extension = Path(original_filename).suffix.lower()
@@ -1,4 +1,8 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import BinaryIO
 from uuid import uuid4
 
 from io import BytesIO
@@ -64,17 +68,101 @@ def _build_pdf_bytes(*, page_count: int) -> bytes:
     return output.getvalue()
 
 
+@dataclass
+class _FakeHTMLCalls:
+    strings: list[str] = field(default_factory=list)
+    base_urls: list[str] = field(default_factory=list)
+    write_options: list[dict[str, object]] = field(default_factory=list)
+
+
+class _FakeHTML:
+    # Replaced per test by _install_fake_html
+    calls: _FakeHTMLCalls
+
+    def __init__(self, *, string: str, base_url: str, url_fetcher: object) -> None:
+        _ = url_fetcher
+        self.calls.strings.append(string)
+        self.calls.base_urls.append(base_url)
+
+    def write_pdf(
+        self,
+        target: BinaryIO | None = None,
+        *,
+        stylesheets: list[object],
+        **options: object,
+    ) -> bytes | None:
+        _ = stylesheets
+        self.calls.write_options.append(options)
+        if target is not None:
+            target.write(b"%PDF-1.7\nfake")
+            return None
+        return b"%PDF-1.7\nfake"
+
+
+def _install_fake_html(monkeypatch: pytest.MonkeyPatch) -> _FakeHTMLCalls:
+    import reportr.reporting.activity_report_pdf_renderer as renderer_module
+
+    calls = _FakeHTMLCalls()
+    monkeypatch.setattr(_FakeHTML, "calls", calls, raising=False)
+    monkeypatch.setattr(renderer_module, "HTML", _FakeHTML)
+    return calls
+
+
+def _session_with_cover_photo(tmp_path: Path) -> tuple[ReportSession, Path]:
+    session_id = uuid4()
+    image_path = (
+        tmp_path
+        / str(session_id)
+        / "images"
+        / PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value
+        / "cover.jpg"
+    )
+    _create_test_image(image_path)
+    session = ReportSession.model_validate(
+        {
+            "id": str(session_id),
+            "form_fields": _build_form_fields_payload(),
+            "images": {
+                PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value: [
+                    ImageMeta(
+                        id=uuid4(),
+                        group_name=PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO,
+                        original_filename="cover.jpg",
+                        stored_filename="cover.jpg",
+                        size_bytes=image_path.stat().st_size,
+                        width=300,
+                        height=220,
+                    )
+                ]
+            },
+        }
+    )
+    return session, image_path
+
+
 def test_renderer_uses_file_uris_and_dynamic_content(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
     captured: dict[str, str] = {}
+    captured_stylesheets: list[list[object]] = []
 
     class FakeHTML:
-        def __init__(self, *, string: str, base_url: str) -> None:
+        def __init__(self, *, string: str, base_url: str, url_fetcher: object) -> None:
             captured["string"] = string
             captured["base_url"] = base_url
 
-        def write_pdf(self) -> bytes:
+        def write_pdf(
+            self,
+            target: BinaryIO | None = None,
+            *,
+            stylesheets: list[object],
+            **options: object,
+        ) -> bytes | None:
+            _ = options
+            captured_stylesheets.append(stylesheets)
+            if target is not None:
+                target.write(b"%PDF-1.7\nfake")
+                return None
             return b"%PDF-1.7\nfake"
 
     import reportr.reporting.activity_report_pdf_renderer as renderer_module
@@ -122,6 +210,9 @@ def test_renderer_uses_file_uris_and_dynamic_content(
     assert "FEBRUARY 2026" in captured["string"]
     assert image_path.resolve().as_uri() in captured["string"]
     assert captured["base_url"] == tmp_path.resolve().as_uri()
+    assert 'src="data:image/svg+xml;base64,' in captured["string"]
+    assert "<style" not in captured["string"]
+    assert captured_stylesheets == [[renderer_module._render_resources().report_stylesheet]]
 
 
 def test_renderer_appends_annex_cover_and_uploaded_pdf(
@@ -130,11 +221,21 @@ def test_renderer_appends_annex_cover_and_uploaded_pdf(
     captured_strings: list[str] = []
 
     class FakeHTML:
-        def __init__(self, *, string: str, base_url: str) -> None:
+        def __init__(self, *, string: str, base_url: str, url_fetcher: object) -> None:
             _ = base_url
             captured_strings.append(string)
 
-        def write_pdf(self) -> bytes:
+        def write_pdf(
+            self,
+            target: BinaryIO | None = None,
+            *,
+            stylesheets: list[object],
+            **options: object,
+        ) -> bytes | None:
+            _ = stylesheets, options
+            if target is not None:
+                target.write(_build_pdf_bytes(page_count=1))
+                return None
             return _build_pdf_bytes(page_count=1)
 
     import reportr.reporting.activity_report_pdf_renderer as renderer_module
@@ -190,19 +291,7 @@ def test_renderer_requires_form_fields(tmp_path: Path) -> None:
 def test_renderer_incomplete_skips_empty_subsections(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
-    captured: dict[str, str] = {}
-
-    class FakeHTML:
-        def __init__(self, *, string: str, base_url: str) -> None:
-            _ = base_url
-            captured["string"] = string
-
-        def write_pdf(self) -> bytes:
-            return b"%PDF-1.7\nfake"
-
-    import reportr.reporting.activity_report_pdf_renderer as renderer_module
-
-    monkeypatch.setattr(renderer_module, "HTML", FakeHTML)
+    calls = _install_fake_html(monkeypatch)
 
     session_id = uuid4()
 
@@ -259,7 +348,7 @@ def test_renderer_incomplete_skips_empty_subsections(
     renderer = WeasyPrintActivityReportPdfRenderer(sessions_root=tmp_path)
     renderer.render(session, allow_incomplete=True)
 
-    html = captured["string"]
+    html = calls.strings[0]
 
     # B: Only rebar scanning has photos → it becomes B.1
     assert "B.1. Rebar Scanning" in html
@@ -287,19 +376,7 @@ def test_renderer_incomplete_skips_empty_subsections(
 def test_renderer_incomplete_no_photos_omits_chapters(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
-    captured: dict[str, str] = {}
-
-    class FakeHTML:
-        def __init__(self, *, string: str, base_url: str) -> None:
-            _ = base_url
-            captured["string"] = string
-
-        def write_pdf(self) -> bytes:
-            return b"%PDF-1.7\nfake"
-
-    import reportr.reporting.activity_report_pdf_renderer as renderer_module
-
-    monkeypatch.setattr(renderer_module, "HTML", FakeHTML)
+    calls = _install_fake_html(monkeypatch)
 
     session = ReportSession.model_validate(
         {
@@ -311,7 +388,7 @@ def test_renderer_incomplete_no_photos_omits_chapters(
     renderer = WeasyPrintActivityReportPdfRenderer(sessions_root=tmp_path)
     renderer.render(session, allow_incomplete=True)
 
-    html = captured["string"]
+    html = calls.strings[0]
 
     # Introduction should still appear
     assert "A. INTRODUCTION" in html
@@ -319,3 +396,114 @@ def test_renderer_incomplete_no_photos_omits_chapters(
     # Chapters with no subsections should be entirely absent
     assert "DATA GATHERING FOR SUPERSTRUCTURE" not in html
     assert "DATA GATHERING FOR SUBSTRUCTURE" not in html
+
+
+def test_render_many_propagates_worker_errors(tmp_path: Path) -> None:
+    renderer = WeasyPrintActivityReportPdfRenderer(sessions_root=tmp_path)
+
+    assert renderer.render_many([]) == []
+    with pytest.raises(RendererNotReadyError):
+        renderer.render_many([ReportSession(id=uuid4())], max_workers=1)
+
+
+def test_renderer_reuses_font_configuration_across_renders(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    calls = _install_fake_html(monkeypatch)
+
+    renderer = WeasyPrintActivityReportPdfRenderer(sessions_root=tmp_path)
+    for _ in range(2):
+        session = ReportSession.model_validate(
+            {"id": str(uuid4()), "form_fields": _build_form_fields_payload()}
+        )
+        renderer.render(session)
+
+    font_configs = [options["font_config"] for options in calls.write_options]
+    assert len(font_configs) == 2
+    assert font_configs[0] is font_configs[1]
+    assert calls.base_urls == [tmp_path.resolve().as_uri()] * 2
+
+
+def test_render_resources_are_built_once_per_thread() -> None:
+    import reportr.reporting.activity_report_pdf_renderer as renderer_module
+
+    resources = renderer_module._render_resources()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread_resources = executor.submit(renderer_module._render_resources).result()
+
+    assert renderer_module._render_resources() is resources
+    assert other_thread_resources.font_config is not resources.font_config
+    assert other_thread_resources.report_stylesheet is not resources.report_stylesheet
+
+
+def test_renderer_lists_each_photo_group_once_per_render(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    import reportr.reporting.activity_report_pdf_renderer as renderer_module
+
+    calls = _install_fake_html(monkeypatch)
+    session, image_path = _session_with_cover_photo(tmp_path)
+    listed_directories: list[str] = []
+    original_scandir = os.scandir
+
+    def counting_scandir(path: str) -> object:
+        if str(session.id) in str(path):
+            listed_directories.append(str(path))
+        return original_scandir(path)
+
+    monkeypatch.setattr(renderer_module.os, "scandir", counting_scandir)
+
+    WeasyPrintActivityReportPdfRenderer(sessions_root=tmp_path).render(session)
+
+    # The building photo is used on the cover and in the introduction figure
+    assert calls.strings[0].count(image_path.resolve().as_uri()) == 2
+    assert listed_directories == [str(image_path.parent)]
+
+
+def test_url_fetcher_reads_session_files_from_disk(tmp_path: Path) -> None:
+    import reportr.reporting.activity_report_pdf_renderer as renderer_module
+
+    image_path = tmp_path / "building photo.jpg"
+    _create_test_image(image_path)
+
+    response = renderer_module._URL_FETCHER(image_path.resolve().as_uri())
+
+    assert response.read() == image_path.read_bytes()
+    assert response.content_type == "image/jpeg"
+
+
+def test_static_headings_and_captions_need_no_escaping() -> None:
+    # The renderer interpolates these literals without escaping them
+    from markupsafe import escape
+
+    import reportr.reporting.activity_report_pdf_renderer as renderer_module
+
+    static_texts = [annex.title for annex in renderer_module._ANNEX_SECTIONS]
+    for _, chapter_heading, subsections in renderer_module._NUMBERED_CHAPTERS:
+        static_texts.append(chapter_heading)
+        for title_suffix, blocks in subsections:
+            static_texts.append(title_suffix)
+            static_texts.extend(
+                block.caption for block in blocks if isinstance(block, renderer_module._FigureDef)
+            )
+
+    assert all(str(escape(text)) == text for text in static_texts)
+
+
+def test_renderer_resolves_sessions_root_only_at_construction(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    calls = _install_fake_html(monkeypatch)
+    session, image_path = _session_with_cover_photo(tmp_path)
+    renderer = WeasyPrintActivityReportPdfRenderer(sessions_root=tmp_path)
+    expected_base_url = tmp_path.resolve().as_uri()
+    expected_image_uri = image_path.resolve().as_uri()
+
+    def fail_resolve(self: Path, strict: bool = False) -> Path:
+        raise AssertionError(f"unexpected resolve() of {self}")
+
+    monkeypatch.setattr(Path, "resolve", fail_resolve)
+    renderer.render(session)
+
+    assert calls.base_urls == [expected_base_url]
+    assert expected_image_uri in calls.strings[0]
@@ -1,3 +1,6 @@
+import os
+from collections.abc import Buffer
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 from pathlib import Path
@@ -8,11 +11,13 @@ import pytest
 from reportr.storage import (
     FileSystemReportRepository,
     AnnexGroupName,
+    PhotoGroupFullError,
     PhotoGroupName,
     ReportFormFields,
     ReportSession,
     ReportStatus,
     SessionNotFoundError,
+    SessionUploadLimitError,
 )
 
 
@@ -87,6 +92,62 @@ def test_create_session_persists_metadata(tmp_path: Path) -> None:
     assert loaded.annex_documents == {}
 
 
+def test_session_metadata_round_trips_through_a_fresh_repository(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    saved = repository.save_form_fields(session.id, build_form_fields())
+
+    metadata_bytes = (tmp_path / "sessions" / str(session.id) / "session.json").read_bytes()
+    reloaded = make_repository(tmp_path).get_session(session.id)
+
+    assert b"\n" not in metadata_bytes
+    assert reloaded is not None
+    assert reloaded == saved
+    assert reloaded.created_at.tzinfo is not None
+
+
+def test_get_session_returns_independent_copies_that_follow_writes(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+
+    first = repository.get_session(session.id)
+    assert first is not None
+    first.status = ReportStatus.COMPLETED
+
+    second = repository.get_session(session.id)
+    assert second is not None
+    assert second.status == ReportStatus.DRAFT
+
+    repository.set_status(session.id, ReportStatus.GENERATING)
+    updated = repository.get_session(session.id)
+
+    assert updated is not None
+    assert updated.status == ReportStatus.GENERATING
+
+
+def test_get_session_reuses_the_session_just_written(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    saved = repository.save_form_fields(session.id, build_form_fields())
+
+    def fail_parse(*args: object, **kwargs: object) -> ReportSession:
+        raise AssertionError("session.json was parsed again after the write")
+
+    monkeypatch.setattr(ReportSession, "model_validate_json", fail_parse)
+    loaded = repository.get_session(session.id)
+
+    assert loaded == saved
+    assert loaded is not saved
+
+    monkeypatch.undo()
+    updated = repository.set_status(session.id, ReportStatus.GENERATING)
+    monkeypatch.setattr(ReportSession, "model_validate_json", fail_parse)
+
+    assert repository.get_session(session.id) == updated
+
+
 def test_save_form_fields_updates_existing_session(tmp_path: Path) -> None:
     repository = make_repository(tmp_path)
     session = repository.create_session()
@@ -117,6 +178,7 @@ def test_save_image_writes_file_and_records_metadata(tmp_path: Path) -> None:
 
     assert image.group_name == PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO
     assert image.stored_filename.endswith(".jpg")
+    assert image.is_landscape is True
     assert loaded is not None
     assert loaded.images[PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value][0] == image
 
@@ -131,6 +193,71 @@ def test_save_image_writes_file_and_records_metadata(tmp_path: Path) -> None:
     assert stored_path.read_bytes() == b"compressed image bytes"
 
 
+def test_save_image_shares_one_file_for_identical_uploads(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    group_name = PhotoGroupName.SUPERSTRUCTURE_REBAR_SCANNING_PHOTOS
+
+    first, second = (
+        repository.save_image(
+            session.id,
+            group_name=group_name,
+            source=BytesIO(b"same photo"),
+            original_filename=original_filename,
+            size_bytes=10,
+            width=800,
+            height=600,
+        )
+        for original_filename in ("before.jpg", "after.jpg")
+    )
+    loaded = repository.get_session(session.id)
+
+    assert first.id != second.id
+    assert first.stored_filename == second.stored_filename
+    assert loaded is not None
+    assert loaded.images[group_name.value] == [first, second]
+
+    group_directory = tmp_path / "sessions" / str(session.id) / "images" / group_name.value
+    assert [path.name for path in group_directory.iterdir()] == [first.stored_filename]
+
+
+def test_uploads_recreate_missing_group_directories(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    session_root = tmp_path / "sessions" / str(session.id)
+    assert (
+        session_root / "images" / PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS.value
+    ).is_dir()
+    assert (session_root / "annexes" / AnnexGroupName.MATERIAL_TESTS_MAPPING.value).is_dir()
+
+    # Sessions stored before group directories were made up front only have the roots
+    repository.cleanup_session_images(session.id)
+    repository.cleanup_session_annex_documents(session.id)
+    image = repository.save_image(
+        session.id,
+        group_name=PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS,
+        source=BytesIO(b"photo"),
+        original_filename="restoration.jpg",
+        size_bytes=5,
+        width=800,
+        height=600,
+    )
+    annex_document = repository.save_annex_document(
+        session.id,
+        group_name=AnnexGroupName.MATERIAL_TESTS_MAPPING,
+        source=BytesIO(b"%PDF-1.7"),
+        original_filename="mapping.pdf",
+        size_bytes=8,
+    )
+
+    image_directory = (
+        session_root / "images" / PhotoGroupName.SUPERSTRUCTURE_RESTORATION_PHOTOS.value
+    )
+    annex_directory = session_root / "annexes" / AnnexGroupName.MATERIAL_TESTS_MAPPING.value
+    assert (image_directory / image.stored_filename).read_bytes() == b"photo"
+    assert (annex_directory / annex_document.stored_filename).read_bytes() == b"%PDF-1.7"
+
+
 def test_save_annex_document_writes_file_and_records_metadata(tmp_path: Path) -> None:
     repository = make_repository(tmp_path)
     session = repository.create_session()
@@ -160,6 +287,151 @@ def test_save_annex_document_writes_file_and_records_metadata(tmp_path: Path) ->
     assert stored_path.read_bytes() == b"%PDF-1.7\nannex"
 
 
+def test_total_upload_bytes_tracks_images_and_replaced_annexes(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+
+    repository.save_image(
+        session.id,
+        group_name=PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO,
+        source=BytesIO(b"compressed image bytes"),
+        original_filename="building.jpg",
+        size_bytes=22,
+        width=1000,
+        height=750,
+    )
+    for size_bytes in (15, 40):
+        repository.save_annex_document(
+            session.id,
+            group_name=AnnexGroupName.REBAR_SCANNING_OUTPUT,
+            source=BytesIO(b"%PDF-1.7\nannex"),
+            original_filename="annex-output.pdf",
+            size_bytes=size_bytes,
+        )
+
+    loaded = repository.get_session(session.id)
+
+    assert loaded is not None
+    assert loaded.total_upload_bytes == 22 + 40
+
+
+def test_save_image_rejects_full_photo_group(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    group_name = PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO
+    upload = {
+        "group_name": group_name,
+        "original_filename": "building.jpg",
+        "size_bytes": 5,
+        "width": 800,
+        "height": 600,
+    }
+    first = repository.save_image(session.id, source=BytesIO(b"first"), **upload)
+
+    with pytest.raises(PhotoGroupFullError) as full_error:
+        repository.save_image(session.id, source=BytesIO(b"other"), **upload)
+
+    loaded = repository.get_session(session.id)
+    assert full_error.value.max_images == 1
+    assert loaded is not None
+    assert loaded.images[group_name.value] == [first]
+    group_directory = tmp_path / "sessions" / str(session.id) / "images" / group_name.value
+    assert [path.name for path in group_directory.iterdir()] == [first.stored_filename]
+
+
+def test_uploads_respect_max_total_upload_bytes(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    repository.save_annex_document(
+        session.id,
+        group_name=AnnexGroupName.REBAR_SCANNING_OUTPUT,
+        source=BytesIO(b"%PDF-1.7\nannex"),
+        original_filename="annex-output.pdf",
+        size_bytes=40,
+        max_total_upload_bytes=50,
+    )
+
+    with pytest.raises(SessionUploadLimitError):
+        repository.save_image(
+            session.id,
+            group_name=PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO,
+            source=BytesIO(b"compressed image bytes"),
+            original_filename="building.jpg",
+            size_bytes=22,
+            width=1000,
+            height=750,
+            max_total_upload_bytes=50,
+        )
+    # Replacing an annex only counts the size difference against the limit
+    repository.save_annex_document(
+        session.id,
+        group_name=AnnexGroupName.REBAR_SCANNING_OUTPUT,
+        source=BytesIO(b"%PDF-1.7\nannex"),
+        original_filename="annex-output.pdf",
+        size_bytes=50,
+        max_total_upload_bytes=50,
+    )
+
+    loaded = repository.get_session(session.id)
+    assert loaded is not None
+    assert loaded.images == {}
+    assert loaded.total_upload_bytes == 50
+
+
+def test_total_upload_bytes_is_backfilled_for_stored_sessions(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    repository.save_image(
+        session.id,
+        group_name=PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO,
+        source=BytesIO(b"compressed image bytes"),
+        original_filename="building.jpg",
+        size_bytes=22,
+        width=1000,
+        height=750,
+    )
+
+    metadata_path = tmp_path / "sessions" / str(session.id) / "session.json"
+    stored_payload = ReportSession.model_validate_json(metadata_path.read_text(encoding="utf-8"))
+    metadata_path.write_text(
+        stored_payload.model_dump_json(exclude={"total_upload_bytes"}), encoding="utf-8"
+    )
+
+    loaded = repository.get_session(session.id)
+
+    assert loaded is not None
+    assert loaded.total_upload_bytes == 22
+
+
+def test_image_orientation_is_backfilled_for_stored_sessions(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    image = repository.save_image(
+        session.id,
+        group_name=PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO,
+        source=BytesIO(b"compressed image bytes"),
+        original_filename="building.jpg",
+        size_bytes=22,
+        width=600,
+        height=900,
+    )
+
+    metadata_path = tmp_path / "sessions" / str(session.id) / "session.json"
+    stored_payload = ReportSession.model_validate_json(metadata_path.read_text(encoding="utf-8"))
+    group_value = PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value
+    metadata_path.write_text(
+        stored_payload.model_dump_json(exclude={"images": {group_value: {0: {"is_landscape"}}}}),
+        encoding="utf-8",
+    )
+    assert "is_landscape" not in metadata_path.read_text(encoding="utf-8")
+
+    loaded = repository.get_session(session.id)
+
+    assert image.is_landscape is False
+    assert loaded is not None
+    assert loaded.images[group_value][0].is_landscape is False
+
+
 def test_persist_generated_pdf_writes_output_and_updates_status(tmp_path: Path) -> None:
     repository = make_repository(tmp_path)
     session = repository.create_session()
@@ -188,6 +460,21 @@ def test_persist_generated_pdf_uses_building_name_slug_in_filename(tmp_path: Pat
     )
 
 
+def test_ensure_completed_if_pdf_exists_restores_completed_status(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    pending = repository.create_session()
+    generated = repository.create_session()
+    report_path = repository.persist_generated_pdf(generated.id, b"%PDF-1.7")
+    repository.set_status(generated.id, ReportStatus.GENERATING)
+
+    assert repository.ensure_completed_if_pdf_exists(pending.id) is None
+    assert repository.ensure_completed_if_pdf_exists(generated.id) == report_path
+
+    loaded = repository.get_session(generated.id)
+    assert loaded is not None
+    assert loaded.status == ReportStatus.COMPLETED
+
+
 def test_get_generated_pdf_path_returns_none_when_not_generated(tmp_path: Path) -> None:
     repository = make_repository(tmp_path)
     session = repository.create_session()
@@ -205,6 +492,65 @@ def test_set_status_updates_session_status(tmp_path: Path) -> None:
 
     assert updated.status == ReportStatus.GENERATING
 
+    metadata_path = tmp_path / "sessions" / str(session.id) / "session.json"
+    inode_before = metadata_path.stat().st_ino
+    unchanged = repository.set_status(session.id, ReportStatus.GENERATING)
+
+    assert unchanged.status == ReportStatus.GENERATING
+    assert metadata_path.stat().st_ino == inode_before
+
+
+def test_concurrent_writes_leave_valid_metadata(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    form_fields = build_form_fields()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(lambda _: repository.save_form_fields(session.id, form_fields), range(64))
+        )
+
+    session_root = tmp_path / "sessions" / str(session.id)
+    stored = ReportSession.model_validate_json((session_root / "session.json").read_bytes())
+    assert stored.form_fields == form_fields
+    assert not list(session_root.glob("*.tmp"))
+
+
+def test_session_lock_only_serializes_its_own_session(tmp_path: Path) -> None:
+    repository = make_repository(tmp_path)
+    busy_session = repository.create_session()
+    other_session = repository.create_session()
+
+    with repository._session_lock(busy_session.id):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            updated = executor.submit(
+                repository.set_status, other_session.id, ReportStatus.GENERATING
+            ).result(timeout=5)
+
+    assert updated.status == ReportStatus.GENERATING
+    # Released locks are dropped, so long-running servers do not keep one per past session
+    assert len(repository._session_locks) == 0
+
+
+def test_session_metadata_survives_short_writes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    repository = make_repository(tmp_path)
+    session = repository.create_session()
+    form_fields = build_form_fields()
+    real_write = os.write
+
+    def short_write(file_descriptor: int, data: Buffer) -> int:
+        return real_write(file_descriptor, memoryview(data)[:7])
+
+    monkeypatch.setattr(os, "write", short_write)
+    repository.save_form_fields(session.id, form_fields)
+    monkeypatch.undo()
+
+    metadata_path = tmp_path / "sessions" / str(session.id) / "session.json"
+    stored = ReportSession.model_validate_json(metadata_path.read_bytes())
+    assert stored.form_fields == form_fields
+
 
 def test_cleanup_session_images_removes_session_image_directory(tmp_path: Path) -> None:
     repository = make_repository(tmp_path)
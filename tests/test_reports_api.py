@@ -1,11 +1,25 @@
+import asyncio
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import suppress
+from functools import cache
 from io import BytesIO
+from multiprocessing import get_context
 from pathlib import Path
 from uuid import UUID
 
+import httpx
+import pytest
+from fastapi import UploadFile
 from fastapi.testclient import TestClient
 from PIL import Image
 from pypdf import PdfWriter
+from starlette.types import ASGIApp
 
+from reportr.app import web_api
 from reportr.app.web_api import create_app
 from reportr.storage import (
     AnnexGroupName,
@@ -27,6 +41,18 @@ class StubRenderer:
         return self.output
 
 
+class CrashOnceRenderer(StubRenderer):
+    def __init__(self, crash_marker: Path) -> None:
+        super().__init__(output=b"%PDF-1.7\nafter-crash")
+        self.crash_marker = crash_marker
+
+    def render(self, session: ReportSession, *, allow_incomplete: bool = False) -> bytes:
+        if not self.crash_marker.exists():
+            self.crash_marker.touch()
+            os._exit(1)
+        return super().render(session, allow_incomplete=allow_incomplete)
+
+
 def build_form_payload() -> dict[str, object]:
     return {
         "building_details": {
@@ -66,13 +92,32 @@ def build_form_payload() -> dict[str, object]:
     }
 
 
-def build_png_bytes(*, width: int = 320, height: int = 240) -> bytes:
+# bytes are immutable, so every test can share one encode per size and format
+@cache
+def build_png_bytes(*, width: int = 320, height: int = 240, image_format: str = "PNG") -> bytes:
     image = Image.new("RGB", (width, height), color=(0, 81, 255))
     output = BytesIO()
-    image.save(output, format="PNG")
+    # pixel content is irrelevant to the API, so store PNG rows uncompressed
+    save_options = {"compress_level": 0} if image_format == "PNG" else {}
+    image.save(output, format=image_format, **save_options)
     return output.getvalue()
 
 
+def build_png_header_bytes(*, width: int, height: int) -> bytes:
+    # A valid PNG structure that declares a raster far larger than its few bytes of pixel data
+    def build_chunk(chunk_type: bytes, data: bytes) -> bytes:
+        checksum = zlib.crc32(chunk_type + data)
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", checksum)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + build_chunk(b"IHDR", header)
+        + build_chunk(b"IDAT", zlib.compress(b""))
+        + build_chunk(b"IEND", b"")
+    )
+
+
 def build_pdf_bytes(*, page_count: int = 1) -> bytes:
     writer = PdfWriter()
     for _ in range(page_count):
@@ -96,22 +141,88 @@ def make_client(
     return TestClient(app), repository
 
 
-def create_complete_session(client: TestClient) -> UUID:
+def create_draft_session(client: TestClient) -> UUID:
     create_response = client.post("/reports")
-    session_id = UUID(create_response.json()["session_id"])
+    assert create_response.status_code == 201
+    return UUID(create_response.json()["session_id"])
+
+
+def create_complete_session(client: TestClient) -> UUID:
+    session_id = create_draft_session(client)
 
     form_response = client.put(f"/reports/{session_id}", json=build_form_payload())
     assert form_response.status_code == 200
 
+    upload_responses = asyncio.run(upload_photo_to_every_group(client.app, session_id))
+    assert [response.status_code for response in upload_responses] == [201] * len(PhotoGroupName)
+
+    return session_id
+
+
+async def upload_photo_to_every_group(app: ASGIApp, session_id: UUID) -> list[httpx.Response]:
+    # Sent together, as the intake form does, so uploads also race on the session metadata
     image_bytes = build_png_bytes()
-    for group_name in PhotoGroupName:
-        upload_response = client.post(
-            f"/reports/{session_id}/images/{group_name.value}",
-            files={"image": ("photo.png", image_bytes, "image/png")},
+    images_url = f"/reports/{session_id}/images"
+    return await post_files_concurrently(
+        app,
+        [
+            (f"{images_url}/{group_name.value}", {"image": ("photo.png", image_bytes, "image/png")})
+            for group_name in PhotoGroupName
+        ],
+    )
+
+
+async def post_files_concurrently(
+    app: ASGIApp, uploads: list[tuple[str, dict[str, tuple[str, bytes, str]]]]
+) -> list[httpx.Response]:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+    ) as async_client:
+        return await asyncio.gather(
+            *(async_client.post(url, files=files) for url, files in uploads)
         )
-        assert upload_response.status_code == 201
 
-    return session_id
+
+async def request_concurrently(
+    app: ASGIApp, method: str, url: str, *, count: int
+) -> list[httpx.Response]:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+    ) as async_client:
+        return await asyncio.gather(*(async_client.request(method, url) for _ in range(count)))
+
+
+def test_concurrent_uploads_keep_every_image(tmp_path: Path) -> None:
+    client, repository = make_client(tmp_path, renderer=StubRenderer())
+
+    session_id = create_complete_session(client)
+
+    stored_session = repository.get_session(session_id)
+    assert stored_session is not None
+    assert sorted(stored_session.images) == sorted(group.value for group in PhotoGroupName)
+    assert all(len(images) == 1 for images in stored_session.images.values())
+
+    # Racing into a one-photo group must not overfill it, even though every request passes the
+    # route's early group check before any of them is saved
+    draft_session_id = create_draft_session(client)
+    group_name = PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO
+    race_responses = asyncio.run(
+        post_files_concurrently(
+            client.app,
+            [
+                (
+                    f"/reports/{draft_session_id}/images/{group_name.value}",
+                    {"image": ("photo.png", build_png_bytes(), "image/png")},
+                )
+            ]
+            * 4,
+        )
+    )
+
+    assert sorted(response.status_code for response in race_responses) == [201, 409, 409, 409]
+    draft_session = repository.get_session(draft_session_id)
+    assert draft_session is not None
+    assert len(draft_session.images[group_name.value]) == 1
 
 
 def test_create_report_session_returns_new_session(tmp_path: Path) -> None:
@@ -127,14 +238,13 @@ def test_create_report_session_returns_new_session(tmp_path: Path) -> None:
 
 def test_update_form_fields_returns_updated_session(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
 
     response = client.put(f"/reports/{session_id}", json=build_form_payload())
 
     assert response.status_code == 200
     response_payload = response.json()
-    assert response_payload["id"] == session_id
+    assert response_payload["id"] == str(session_id)
     assert (
         response_payload["form_fields"]["building_details"]["building_name"] == "Acacia Residences"
     )
@@ -142,8 +252,7 @@ def test_update_form_fields_returns_updated_session(tmp_path: Path) -> None:
 
 def test_upload_image_saves_metadata(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
 
     response = client.post(
         f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
@@ -157,10 +266,77 @@ def test_upload_image_saves_metadata(tmp_path: Path) -> None:
     assert response_payload["height"] == 240
 
 
+@pytest.mark.parametrize(
+    ("image_format", "content_type"),
+    [("JPEG", "image/jpeg"), ("WEBP", "image/webp")],
+)
+def test_upload_image_reads_dimensions_for_each_format(
+    tmp_path: Path, image_format: str, content_type: str
+) -> None:
+    client, _ = make_client(tmp_path)
+    session_id = create_draft_session(client)
+
+    response = client.post(
+        f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
+        files={
+            "image": (
+                "building.img",
+                build_png_bytes(width=200, height=300, image_format=image_format),
+                content_type,
+            )
+        },
+    )
+
+    assert response.status_code == 201
+    response_payload = response.json()["image"]
+    assert response_payload["width"] == 200
+    assert response_payload["height"] == 300
+
+
+def test_upload_image_rejects_undecodable_content(tmp_path: Path) -> None:
+    client, _ = make_client(tmp_path)
+    session_id = create_draft_session(client)
+
+    response = client.post(
+        f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
+        files={"image": ("building.png", b"\x89PNG\r\n\x1a\ntruncated", "image/png")},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Uploaded file is not a valid image."
+
+
+@pytest.mark.parametrize("max_image_pixels", [None, 10**12])
+def test_upload_image_rejects_huge_declared_dimensions(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, max_image_pixels: int | None
+) -> None:
+    if max_image_pixels is not None:
+        # Past the probe's cap, Pillow's own decompression bomb check must still answer 413
+        monkeypatch.setattr(web_api, "MAX_IMAGE_PIXELS", max_image_pixels)
+    client, repository = make_client(tmp_path)
+    session_id = create_draft_session(client)
+
+    response = client.post(
+        f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
+        files={
+            "image": (
+                "bomb.png",
+                build_png_header_bytes(width=20000, height=20000),
+                "image/png",
+            )
+        },
+    )
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Image exceeds the 50 megapixel limit."
+    stored_session = repository.get_session(session_id)
+    assert stored_session is not None
+    assert stored_session.images == {}
+
+
 def test_upload_image_rejects_unsupported_mime_type(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
 
     response = client.post(
         f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
@@ -170,23 +346,98 @@ def test_upload_image_rejects_unsupported_mime_type(tmp_path: Path) -> None:
     assert response.status_code == 415
 
 
-def test_upload_image_rejects_oversized_dimensions(tmp_path: Path) -> None:
+@pytest.mark.parametrize(
+    ("image_format", "mime_type"), [("PNG", "image/png"), ("JPEG", "image/jpeg")]
+)
+def test_upload_image_downscales_oversized_dimensions(
+    tmp_path: Path, image_format: str, mime_type: str
+) -> None:
+    client, repository = make_client(tmp_path)
+    session_id = create_draft_session(client)
+    extension = image_format.lower()
+
+    response = client.post(
+        f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
+        files={
+            "image": (
+                f"building.{extension}",
+                build_png_bytes(width=2600, height=1300, image_format=image_format),
+                mime_type,
+            )
+        },
+    )
+
+    assert response.status_code == 201
+    image_payload = response.json()["image"]
+    assert image_payload["width"] == 1000
+    assert image_payload["height"] == 500
+
+    stored_path = (
+        tmp_path
+        / "sessions"
+        / str(session_id)
+        / "images"
+        / PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value
+        / image_payload["stored_filename"]
+    )
+    assert stored_path.stat().st_size == image_payload["size_bytes"]
+    with Image.open(stored_path) as stored_image:
+        assert stored_image.format == image_format
+        assert stored_image.size == (1000, 500)
+
+    loaded = repository.get_session(session_id)
+    assert loaded is not None
+    assert loaded.total_upload_bytes == image_payload["size_bytes"]
+
+
+def test_upload_image_downscale_applies_exif_rotation(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
+
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise for display
+    output = BytesIO()
+    Image.new("RGB", (2600, 1300), color=(10, 80, 200)).save(output, format="JPEG", exif=exif)
 
     response = client.post(
         f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
-        files={"image": ("building.png", build_png_bytes(width=1301, height=500), "image/png")},
+        files={"image": ("building.jpg", output.getvalue(), "image/jpeg")},
     )
 
-    assert response.status_code == 422
+    assert response.status_code == 201
+    image_payload = response.json()["image"]
+    assert (image_payload["width"], image_payload["height"]) == (500, 1000)
+    assert image_payload["is_landscape"] is False
+
+
+def test_upload_image_rejects_oversized_file(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(web_api, "MAX_FILE_SIZE_BYTES", 1024)
+    client, repository = make_client(tmp_path)
+    session_id = create_draft_session(client)
+
+    response = client.post(
+        f"/reports/{session_id}/images/{PhotoGroupName.BUILDING_DETAILS_BUILDING_PHOTO.value}",
+        files={"image": ("building.png", build_png_bytes() + bytes(1024), "image/png")},
+    )
+
+    assert response.status_code == 413
+    stored_session = repository.get_session(session_id)
+    assert stored_session is not None
+    assert stored_session.images == {}
+
+
+def test_read_upload_rejects_declared_oversize_without_reading() -> None:
+    upload = UploadFile(BytesIO(bytes(2048)), size=2048)
+
+    assert asyncio.run(web_api._read_upload(upload, limit=1024)) is None
+    assert upload.file.tell() == 0
 
 
 def test_upload_image_rejects_when_group_hits_max_limit(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
     image_bytes = build_png_bytes()
 
     first_upload = client.post(
@@ -204,8 +455,7 @@ def test_upload_image_rejects_when_group_hits_max_limit(tmp_path: Path) -> None:
 
 def test_upload_image_accepts_five_images_for_core_samples_group(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
     image_bytes = build_png_bytes()
 
     for _ in range(5):
@@ -226,8 +476,7 @@ def test_upload_image_accepts_five_images_for_core_samples_group(tmp_path: Path)
 
 def test_upload_annex_document_saves_metadata(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
 
     response = client.post(
         f"/reports/{session_id}/annexes/{AnnexGroupName.REBAR_SCANNING_OUTPUT.value}",
@@ -240,10 +489,39 @@ def test_upload_annex_document_saves_metadata(tmp_path: Path) -> None:
     assert response_payload["original_filename"] == "annex-i.pdf"
 
 
+def test_concurrent_annex_uploads_respect_session_upload_limit(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    pdf_bytes = build_pdf_bytes()
+    # Room for one annex; each request alone passes the route's own quota check
+    monkeypatch.setattr(web_api, "MAX_SESSION_SIZE_BYTES", len(pdf_bytes) * 3 // 2)
+    client, repository = make_client(tmp_path)
+    session_id = create_draft_session(client)
+
+    responses = asyncio.run(
+        post_files_concurrently(
+            client.app,
+            [
+                (
+                    f"/reports/{session_id}/annexes/{group_name.value}",
+                    {"document": ("annex.pdf", pdf_bytes, "application/pdf")},
+                )
+                for group_name in AnnexGroupName
+            ],
+        )
+    )
+
+    status_codes = sorted(response.status_code for response in responses)
+    assert status_codes == [201] + [413] * (len(AnnexGroupName) - 1)
+    stored_session = repository.get_session(session_id)
+    assert stored_session is not None
+    assert len(stored_session.annex_documents) == 1
+    assert stored_session.total_upload_bytes == len(pdf_bytes)
+
+
 def test_upload_annex_document_rejects_invalid_pdf(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
 
     response = client.post(
         f"/reports/{session_id}/annexes/{AnnexGroupName.REBAR_SCANNING_OUTPUT.value}",
@@ -256,8 +534,7 @@ def test_upload_annex_document_rejects_invalid_pdf(tmp_path: Path) -> None:
 
 def test_generate_report_rejects_missing_form_fields(tmp_path: Path) -> None:
     client, _ = make_client(tmp_path)
-    create_response = client.post("/reports")
-    session_id = create_response.json()["session_id"]
+    session_id = create_draft_session(client)
 
     response = client.post(f"/reports/{session_id}/generate")
 
@@ -299,8 +576,9 @@ def test_generate_report_persists_pdf_after_validation(tmp_path: Path) -> None:
     assert not images_root.exists()
     assert not annex_root.exists()
 
-    first_download = client.get(f"/reports/{session_id}/download")
-    second_download = client.get(f"/reports/{session_id}/download")
+    first_download, second_download = asyncio.run(
+        request_concurrently(client.app, "GET", f"/reports/{session_id}/download", count=2)
+    )
 
     assert first_download.status_code == 200
     assert second_download.status_code == 200
@@ -312,6 +590,102 @@ def test_generate_report_persists_pdf_after_validation(tmp_path: Path) -> None:
     assert "acacia-residences-activity-report.pdf" in content_disposition
 
 
+def test_download_report_returns_not_modified_for_matching_etag(tmp_path: Path) -> None:
+    client, _ = make_client(tmp_path, renderer=StubRenderer(output=b"%PDF-1.7\nrendered"))
+    session_id = create_complete_session(client)
+    client.post(f"/reports/{session_id}/generate")
+
+    first_download = client.get(f"/reports/{session_id}/download")
+    etag = first_download.headers["etag"]
+    cached_download = client.get(f"/reports/{session_id}/download", headers={"If-None-Match": etag})
+
+    assert first_download.status_code == 200
+    assert first_download.headers["cache-control"] == "private, max-age=3600"
+    assert cached_download.status_code == 304
+    assert cached_download.headers["etag"] == etag
+    assert cached_download.content == b""
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ['"stale-tag", {etag}', 'W/"stale-tag",W/{etag}', "*"],
+)
+def test_download_report_matches_if_none_match_tag_lists(
+    tmp_path: Path, if_none_match: str
+) -> None:
+    client, _ = make_client(tmp_path, renderer=StubRenderer())
+    session_id = create_complete_session(client)
+    client.post(f"/reports/{session_id}/generate")
+    etag = client.get(f"/reports/{session_id}/download").headers["etag"]
+
+    cached_download = client.get(
+        f"/reports/{session_id}/download",
+        headers={"If-None-Match": if_none_match.format(etag=etag)},
+    )
+    stale_download = client.get(
+        f"/reports/{session_id}/download", headers={"If-None-Match": '"stale-tag"'}
+    )
+
+    assert cached_download.status_code == 304
+    assert stale_download.status_code == 200
+
+
+def test_generate_report_renders_in_provided_process_pool(tmp_path: Path) -> None:
+    repository = FileSystemReportRepository(
+        sessions_root=tmp_path / "sessions",
+        reports_root=tmp_path / "reports",
+    )
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        app = create_app(
+            repository=repository,
+            renderer=StubRenderer(output=b"%PDF-1.7\nfrom-worker"),
+            cleanup_interval_seconds=0,
+            render_executor=executor,
+        )
+        client = TestClient(app)
+        session_id = create_complete_session(client)
+
+        response = client.post(f"/reports/{session_id}/generate")
+
+    assert response.status_code == 200
+    assert client.get(f"/reports/{session_id}/download").content == b"%PDF-1.7\nfrom-worker"
+
+
+def test_generate_report_replaces_default_render_pool_after_worker_crash(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(
+        web_api,
+        "_build_default_render_executor",
+        lambda renderer: ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")),
+    )
+    repository = FileSystemReportRepository(
+        sessions_root=tmp_path / "sessions",
+        reports_root=tmp_path / "reports",
+    )
+    app = create_app(
+        repository=repository,
+        renderer=CrashOnceRenderer(tmp_path / "crashed"),
+        cleanup_interval_seconds=0,
+    )
+
+    with TestClient(app) as client:
+        session_id = create_complete_session(client)
+        broken_executor = app.state.render_executor
+
+        crashed_response = client.post(f"/reports/{session_id}/generate")
+        crashed_session = repository.get_session(session_id)
+        retried_response = client.post(f"/reports/{session_id}/generate")
+
+        assert app.state.render_executor is not broken_executor
+
+    assert crashed_response.status_code == 503
+    assert crashed_session is not None
+    assert crashed_session.status == ReportStatus.DRAFT
+    assert retried_response.status_code == 200
+    assert client.get(f"/reports/{session_id}/download").content == b"%PDF-1.7\nafter-crash"
+
+
 def test_generate_report_returns_existing_download_when_already_completed(tmp_path: Path) -> None:
     renderer = StubRenderer(output=b"%PDF-1.7\nrendered")
     client, repository = make_client(tmp_path, renderer=renderer)
@@ -356,6 +730,89 @@ def test_generate_report_returns_existing_download_when_pdf_exists_but_status_is
     assert refreshed_session.status == ReportStatus.COMPLETED
 
 
+def test_concurrent_generate_requests_render_once(tmp_path: Path) -> None:
+    class SlowClaimRepository(FileSystemReportRepository):
+        def set_status(
+            self,
+            session_id: UUID,
+            status: ReportStatus,
+            *,
+            expected_status: ReportStatus | None = None,
+        ) -> ReportSession:
+            # Holds the first claim back until the other request has read the draft session
+            if status == ReportStatus.GENERATING:
+                time.sleep(0.2)
+            return super().set_status(session_id, status, expected_status=expected_status)
+
+    repository = SlowClaimRepository(
+        sessions_root=tmp_path / "sessions",
+        reports_root=tmp_path / "reports",
+    )
+    renderer = StubRenderer()
+    client = TestClient(
+        create_app(repository=repository, renderer=renderer, cleanup_interval_seconds=0)
+    )
+    session_id = create_complete_session(client)
+
+    responses = asyncio.run(
+        request_concurrently(client.app, "POST", f"/reports/{session_id}/generate", count=2)
+    )
+
+    assert sorted(response.status_code for response in responses) == [200, 409]
+    assert renderer.render_call_count == 1
+    stored_session = repository.get_session(session_id)
+    assert stored_session is not None
+    assert stored_session.status == ReportStatus.COMPLETED
+
+
+def test_report_routes_keep_repository_calls_off_the_event_loop(tmp_path: Path) -> None:
+    loop_calls: list[str] = []
+
+    def record_if_on_event_loop(method_name: str) -> None:
+        with suppress(RuntimeError):
+            asyncio.get_running_loop()
+            loop_calls.append(method_name)
+
+    class LoopCheckingRepository(FileSystemReportRepository):
+        def get_session(self, session_id: UUID) -> ReportSession | None:
+            record_if_on_event_loop("get_session")
+            return super().get_session(session_id)
+
+        def set_status(
+            self,
+            session_id: UUID,
+            status: ReportStatus,
+            *,
+            expected_status: ReportStatus | None = None,
+        ) -> ReportSession:
+            record_if_on_event_loop("set_status")
+            return super().set_status(session_id, status, expected_status=expected_status)
+
+        def persist_generated_pdf(self, session_id: UUID, pdf_bytes: bytes) -> Path:
+            record_if_on_event_loop("persist_generated_pdf")
+            return super().persist_generated_pdf(session_id, pdf_bytes)
+
+        def ensure_completed_if_pdf_exists(self, session_id: UUID) -> Path | None:
+            record_if_on_event_loop("ensure_completed_if_pdf_exists")
+            return super().ensure_completed_if_pdf_exists(session_id)
+
+    repository = LoopCheckingRepository(
+        sessions_root=tmp_path / "sessions",
+        reports_root=tmp_path / "reports",
+    )
+    app = create_app(repository=repository, renderer=StubRenderer(), cleanup_interval_seconds=0)
+    client = TestClient(app)
+    session_id = create_complete_session(client)
+    client.post(
+        f"/reports/{session_id}/annexes/{AnnexGroupName.REBAR_SCANNING_OUTPUT.value}",
+        files={"document": ("annex.pdf", build_pdf_bytes(), "application/pdf")},
+    )
+
+    assert client.post(f"/reports/{session_id}/generate").status_code == 200
+    assert client.get(f"/reports/{session_id}/download").status_code == 200
+    assert loop_calls == []
+
+
 def test_generate_report_returns_conflict_when_generation_is_already_in_progress(
     tmp_path: Path,
 ) -> None:
@@ -397,8 +854,7 @@ def test_generate_report_succeeds_without_photos(tmp_path: Path) -> None:
     renderer = StubRenderer(output=b"%PDF-1.7\nincomplete")
     client, repository = make_client(tmp_path, renderer=renderer)
 
-    create_response = client.post("/reports")
-    session_id = UUID(create_response.json()["session_id"])
+    session_id = create_draft_session(client)
 
     form_response = client.put(f"/reports/{session_id}", json=build_form_payload())
     assert form_response.status_code == 200
@@ -420,8 +876,7 @@ def test_generate_report_with_partial_photos(tmp_path: Path) -> None:
     renderer = StubRenderer(output=b"%PDF-1.7\npartial")
     client, _ = make_client(tmp_path, renderer=renderer)
 
-    create_response = client.post("/reports")
-    session_id = UUID(create_response.json()["session_id"])
+    session_id = create_draft_session(client)
 
     client.put(f"/reports/{session_id}", json=build_form_payload())
 
@@ -442,3 +897,93 @@ def test_generate_report_with_partial_photos(tmp_path: Path) -> None:
 
     assert response.status_code == 200
     assert renderer.render_call_count == 1
+
+
+def test_lifespan_runs_session_cleanup_only_inside_client_context(tmp_path: Path) -> None:
+    repository = FileSystemReportRepository(
+        sessions_root=tmp_path / "sessions",
+        reports_root=tmp_path / "reports",
+    )
+    app = create_app(repository=repository, renderer=StubRenderer())
+    client = TestClient(app)
+
+    assert client.get("/health").status_code == 200
+    assert not hasattr(app.state, "cleanup_task")
+
+    with client:
+        cleanup_task = app.state.cleanup_task
+        assert cleanup_task is not None
+        assert not cleanup_task.done()
+
+    assert cleanup_task.cancelled()
+
+
+def test_lifespan_creates_a_fresh_default_render_pool_per_startup(tmp_path: Path) -> None:
+    repository = FileSystemReportRepository(
+        sessions_root=tmp_path / "sessions",
+        reports_root=tmp_path / "reports",
+    )
+    app = create_app(repository=repository, cleanup_interval_seconds=0)
+    client = TestClient(app)
+    assert app.state.render_executor is None
+
+    executors: list[object] = []
+    for _ in range(2):
+        with client:
+            executor = app.state.render_executor
+            assert isinstance(executor, ProcessPoolExecutor)
+            executors.append(executor)
+        assert app.state.render_executor is None
+
+    assert executors[0] is not executors[1]
+
+
+def test_lifespan_leaves_injected_render_executor_running(tmp_path: Path) -> None:
+    repository = FileSystemReportRepository(
+        sessions_root=tmp_path / "sessions",
+        reports_root=tmp_path / "reports",
+    )
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        app = create_app(
+            repository=repository,
+            renderer=StubRenderer(),
+            cleanup_interval_seconds=0,
+            render_executor=executor,
+        )
+        client = TestClient(app)
+        for _ in range(2):
+            with client:
+                assert app.state.render_executor is executor
+
+        assert app.state.render_executor is executor
+        assert executor.submit(int).result() == 0
+
+
+def test_credit_semaphore_holds_large_reservations_until_credits_free() -> None:
+    async def scenario() -> list[str]:
+        semaphore = web_api.CreditSemaphore(total_credits=10)
+        order: list[str] = []
+        small_started = asyncio.Event()
+        release_small = asyncio.Event()
+
+        async def small() -> None:
+            async with semaphore.reserve(4):
+                order.append("small")
+                small_started.set()
+                await release_small.wait()
+
+        async def large() -> None:
+            await small_started.wait()
+            async with semaphore.reserve(50):
+                order.append("large")
+
+        large_task = asyncio.create_task(large())
+        small_task = asyncio.create_task(small())
+        await small_started.wait()
+        await asyncio.sleep(0)
+        order.append("released")
+        release_small.set()
+        await asyncio.gather(small_task, large_task)
+        return order
+
+    assert asyncio.run(scenario()) == ["small", "released", "large"]
@@ -9,6 +9,8 @@ from reportr.app.web_api import (
 )
 from reportr.storage import FileSystemReportRepository
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
 
 def test_resolve_repository_roots_defaults_to_repo_data(monkeypatch) -> None:
     monkeypatch.delenv(DATA_ROOT_ENV, raising=False)
@@ -17,9 +19,8 @@ def test_resolve_repository_roots_defaults_to_repo_data(monkeypatch) -> None:
 
     sessions_root, reports_root = _resolve_repository_roots()
 
-    repo_root = Path(__file__).resolve().parents[1]
-    assert sessions_root == repo_root / "data" / "sessions"
-    assert reports_root == repo_root / "data" / "reports"
+    assert sessions_root == REPO_ROOT / "data" / "sessions"
+    assert reports_root == REPO_ROOT / "data" / "reports"
 
 
 def test_resolve_repository_roots_uses_data_root_env(monkeypatch, tmp_path: Path) -> None: